@@ -0,0 +1,75 @@
+# bench/inventory_memory.py
+#
+# Memory used per inventory row: a dictionary per row (as oci-resources.py used to build) compared with
+# the compact InventoryRow from ocicloud/inventory.py
+#
+# Rows are synthetic but with realistic cardinality: few tenancies/regions/types/shapes, a few hundred
+# compartments and creators, unique names and OCIDs.
+#
+# Usage (from the repository root):
+#		python -m bench.inventory_memory [row_count ...]		(default 100000 1000000)
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from ocicloud.inventory import InventoryRow, field_names
+
+regions = ['eu-frankfurt-1', 'uk-london-1', 'us-ashburn-1', 'us-phoenix-1', 'ap-tokyo-1', 'eu-amsterdam-1']
+types = ['Instance', 'Volume', 'BootVolume', 'Bucket', 'AutonomousDatabase', 'DbSystem', 'VolumeBackup', 'Image']
+states = ['AVAILABLE', 'RUNNING', 'STOPPED', 'PROVISIONING']
+shapes = ['', 'VM.Standard.E4.Flex', 'VM.Standard2.1', 'BM.Standard3.64']
+
+
+# Column values for row i, built the way the SDK returns them (new string objects for every row)
+def row_values(i):
+	rtype = types[i % len(types)]
+	return (
+		''.join(['tenancy', '1']),
+		''.join([regions[i % len(regions)]]),
+		f'/root/project{i % 300 // 10}/comp{i % 300}',
+		''.join([rtype]),
+		f'{rtype.lower()}-{i}',
+		''.join([states[i % len(states)]]),
+		'',
+		''.join([shapes[i % len(shapes)]]),
+		i % 8,
+		float(i % 1000),
+		'',
+		'Attached' if rtype == 'Volume' else '',
+		f'2021-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:{i % 60:02d}:00',
+		f'user{i % 500}@example.com',
+		f'ocid1.{rtype.lower()}.oc1.{regions[i % len(regions)]}.aaaaaaaa{i:032d}')
+
+
+def as_dict(values):
+	return dict(zip(field_names, values))
+
+
+# Bytes allocated (and seconds taken) to hold row_count rows built by make_row
+def measure(make_row, row_count):
+	gc.collect()
+	tracemalloc.start()
+	start = time.perf_counter()
+
+	rows = [make_row(row_values(i)) for i in range(row_count)]
+
+	elapsed = time.perf_counter() - start
+	current, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	del rows
+	return current, elapsed
+
+
+if __name__ == "__main__":
+	counts = [int(n) for n in sys.argv[1:]] or [100000, 1000000]
+
+	print(f"{'Rows':>10} {'Representation':16} {'MBytes':>10} {'Bytes/row':>10} {'Secs':>8}")
+	for row_count in counts:
+		for label, make_row in (('dict', as_dict), ('InventoryRow', lambda v: InventoryRow(*v))):
+			total_bytes, elapsed = measure(make_row, row_count)
+			print(f'{row_count:10d} {label:16} {total_bytes / 1e6:10.1f} {total_bytes / row_count:10.0f} {elapsed:8.2f}')
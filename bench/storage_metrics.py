@@ -0,0 +1,165 @@
+# bench/storage_metrics.py
+#
+# Bucket and file system sizing in resources.iter_region_pages: a request per resource (get_bucket and
+# get_file_system) compared with Monitoring metrics in bulk (storage_metrics=True, see ocicloud/metrics.py)
+#
+# Runs against stand-in SDK clients (search, object storage, file storage, monitoring) with a fixed delay per
+# request, so no tenancy is needed. Each resource has a known size, reported the same way by both methods, and the
+# sizes found are checked against it. A third case has the Monitoring client refuse the request (as when there is
+# no 'read metrics' policy), which has to fall back to the per-resource requests with the same results.
+#
+# Reported per case:
+#		Requests	SDK requests made, by client
+#		Secs		time to list the region
+#		Sizes		'ok' if every bucket and file system got its expected size
+#
+# Usage (from the repository root):
+#		python -m bench.storage_metrics [resource_count ...]		(default 100 1000)
+#			--delay <ms>	time per stand-in request (default 5)
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import argparse
+import datetime
+import os
+import tempfile
+import time
+import types
+
+import oci
+
+from ocicloud import capabilities, resources
+
+region_name = 'uk-london-1'
+tenancy_id = 'ocid1.tenancy.bench'
+compartments = [{'id': f'ocid1.compartment.bench.{c}', 'name': f'c{c}', 'path': f'/root/c{c}', 'state': 'ACTIVE'}
+	for c in range(10)]
+
+request_delay = 0.005
+
+
+# Stand-in SDK responses and records (only the attributes the code reads)
+def response(data, next_page=None):
+	return types.SimpleNamespace(data=data, next_page=next_page)
+
+
+# Size of resource i, in bytes (buckets have standard and archive tiers, reported separately by Monitoring)
+def resource_bytes(i):
+	return (i + 1) * 1e9
+
+
+class StandIns:
+
+	def __init__(self, resource_count, metrics_denied=False):
+		self.metrics_denied = metrics_denied
+		self.requests = {}
+
+		now = datetime.datetime.now(datetime.timezone.utc)
+		self.resources = [
+			types.SimpleNamespace(
+				resource_type='Bucket' if i % 2 == 0 else 'FileSystem',
+				identifier=f"ocid1.{'bucket' if i % 2 == 0 else 'filesystem'}.bench.{i}",
+				display_name=f'resource-{i}', lifecycle_state='ACTIVE', defined_tags={},
+				compartment_id=compartments[i % len(compartments)]['id'], time_created=now)
+			for i in range(resource_count)]
+		self.sizes = {r.identifier: resource_bytes(i) for i, r in enumerate(self.resources)}
+		self.by_name = {r.display_name: r for r in self.resources}
+
+	def request(self, client):
+		self.requests[client] = self.requests.get(client, 0) + 1
+		time.sleep(request_delay)
+
+	# Resource search, 100 results a page
+	def search_resources(self, search_details, page=None, limit=None):
+		self.request('search')
+		start = int(page or 0)
+		end = start + (limit or 100)
+		return response(
+			types.SimpleNamespace(items=self.resources[start:end]), None if end >= len(self.resources) else str(end))
+
+	def get_namespace(self):
+		self.request('object_storage')
+		return response('benchns')
+
+	def get_bucket(self, namespace, bucket_name, fields=None):
+		self.request('object_storage')
+		return response(types.SimpleNamespace(approximate_size=self.sizes[self.by_name[bucket_name].identifier]))
+
+	def get_file_system(self, file_system_id):
+		self.request('file_storage')
+		return response(types.SimpleNamespace(metered_bytes=self.sizes[file_system_id]))
+
+	def summarize_metrics_data(self, compartment_id, details, compartment_id_in_subtree=False):
+		self.request('monitoring')
+		if self.metrics_denied:
+			raise oci.exceptions.ServiceError(404, 'NotAuthorizedOrNotFound', {}, 'Authorization failed')
+
+		now = datetime.datetime.now(datetime.timezone.utc)
+		metric_data = []
+		for r in self.resources:
+			if compartment_id != tenancy_id and r.compartment_id != compartment_id:
+				continue
+
+			if r.resource_type == 'Bucket' and details.namespace == 'oci_objectstorage':
+				# Three quarters standard, a quarter archive
+				tiers = [('Standard', self.sizes[r.identifier] * 0.75), ('Archive', self.sizes[r.identifier] * 0.25)]
+				dimension = 'resourceID'
+			elif r.resource_type == 'FileSystem' and details.namespace == 'oci_filestorage':
+				tiers = [(None, self.sizes[r.identifier])]
+				dimension = 'resourceId'
+			else:
+				continue
+
+			for tier, size in tiers:
+				metric_data.append(types.SimpleNamespace(
+					dimensions={dimension: r.identifier, 'tier': tier},
+					aggregated_datapoints=[
+						types.SimpleNamespace(timestamp=now - datetime.timedelta(hours=2), value=size / 2),
+						types.SimpleNamespace(timestamp=now - datetime.timedelta(hours=1), value=size)]))
+		return response(metric_data)
+
+
+# A Tenancy using the stand-in clients instead of the SDK's
+class BenchTenancy(resources.Tenancy):
+
+	def __init__(self, stand_ins):
+		super().__init__({'tenancy': tenancy_id}, 'bench', [region_name], compartments)
+		self._clients[region_name] = types.SimpleNamespace(
+			search=stand_ins, object_storage=stand_ins, file_storage=stand_ins, monitoring=stand_ins)
+
+
+def run_case(resource_count, storage_metrics, metrics_denied):
+	stand_ins = StandIns(resource_count, metrics_denied)
+	tenancy = BenchTenancy(stand_ins)
+	filters = dict(resources.no_filters, types=['bucket', 'filesystem'])
+
+	start = time.perf_counter()
+	rows = [
+		row for rows, _ in resources.iter_region_pages(tenancy, region_name, filters, storage_metrics=storage_metrics)
+		for row in rows]
+	seconds = time.perf_counter() - start
+
+	# Stand-in sizes are whole GB, so compare rounded
+	sizes_ok = len(rows) == resource_count and all(
+		round(row.gbytes, 6) == round(stand_ins.sizes[row.ocid] / 1e9, 6) for row in rows)
+	return stand_ins.requests, seconds, sizes_ok
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description='Storage sizing benchmark')
+	parser.add_argument('resource_counts', nargs='*', type=int, default=[100, 1000])
+	parser.add_argument('--delay', type=float, default=5.0, help='Milliseconds per stand-in request')
+	args = parser.parse_args()
+	request_delay = args.delay / 1000
+
+	# Keep the capability probes of the stand-ins out of the real cache
+	capabilities.cache_file = os.path.join(tempfile.mkdtemp(prefix='bench-storage-'), 'capabilities.json')
+
+	cases = [('per resource', False, False), ('metrics', True, False), ('metrics denied', True, True)]
+
+	print(f"{'Resources':>9} {'Case':16} {'Secs':>7} {'Sizes':6} Requests")
+	for resource_count in args.resource_counts:
+		for name, storage_metrics, metrics_denied in cases:
+			requests, seconds, sizes_ok = run_case(resource_count, storage_metrics, metrics_denied)
+			request_counts = ', '.join(f'{client} {count}' for client, count in sorted(requests.items()))
+			print(f"{resource_count:9d} {name:16} {seconds:7.2f} {'ok' if sizes_ok else 'WRONG':6} {request_counts}")
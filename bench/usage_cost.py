@@ -0,0 +1,238 @@
+# bench/usage_cost.py
+#
+# Benchmark of the usage cost path in usage_cost_total.py (get_account_charges): fetch, parse, overage unit
+# price correction, list price lookup and totals, for TOTAL and --detail output
+#
+# Synthetic usagecost and price list payloads are generated (fixed random seed, so the same fixtures every time)
+# and served gzip compressed from a local HTTP server standing in for the metering and price list APIs.
+# Each case is run in a separate process so its peak memory (max RSS) is measured on its own.
+#
+# Reported per case:
+#		Items/s		line items processed per second, end to end (request to last row)
+#		FirstRow	seconds until the first output row (the totals line for TOTAL output)
+#		PeakMB		peak resident memory of the process
+#		Totals		billed, corrected and list totals (to check a change gives the same results)
+#
+# Usage (from the repository root):
+#		python -m bench.usage_cost [item_count ...]		(default 1000 10000 100000 1000000)
+#			--fixtures <dir>	keep generated payloads in this directory (and reuse them on later runs)
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import argparse
+import gzip
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+seed = 2018
+
+services = [
+	('COMPUTE', 'PIC_COMPUTE_STANDARD_E4_OCPU', 'B93113', 0.025),
+	('COMPUTE', 'PIC_COMPUTE_STANDARD_E4_MEMORY', 'B93114', 0.0015),
+	('BLOCK_STORAGE', 'PIC_BLOCK_STORAGE_STANDARD', 'B91961', 0.0255),
+	('BLOCK_STORAGE', 'PIC_BLOCK_STORAGE_PERFORMANCE', 'B91962', 0.0017),
+	('OBJECT_STORAGE', 'PIC_OBJECT_STORAGE_TB_MONTH', 'B91628', 0.0255),
+	('NETWORK', 'PIC_COMPUTE_OUTBOUND_DATA_TRANSFER', 'B88327', 0.0085),  # Free first 10TB
+	('ADWC', 'ADWC_OCPU_HOURS', 'B89040', 1.3441),
+	('ATP', 'ATP_OCPU_HOURS', 'B90453', 1.3441),
+	('ANALYTICS', 'ANALYTICS_OCPU_HOURS', 'B92682', 1.0753),
+	('INTEGRATION', 'OIC_MESSAGE_PACKS', 'B89639', 0.6452),
+	('FUNCTIONS', 'FUNCTIONS_EXECUTION_TIME', 'B90617', 0.00001417),
+	('DATABASE', 'DBCS_EE_OCPU_HOURS', 'B90570', 0.8602),
+]
+
+
+# Price list payload, as returned by the price list API (B88327 has a free band)
+def price_list_payload():
+	items = []
+	for service_name, resource_name, part_num, price in services:
+		if part_num == 'B88327':
+			prices = [
+				{'model': 'PAY_AS_YOU_GO', 'value': 0, 'rangeMin': 0, 'rangeMax': 10240},
+				{'model': 'PAY_AS_YOU_GO', 'value': price, 'rangeMin': 10240},
+				{'model': 'MONTHLY_COMMIT', 'value': 0, 'rangeMin': 0, 'rangeMax': 10240},
+				{'model': 'MONTHLY_COMMIT', 'value': price, 'rangeMin': 10240}]
+		else:
+			prices = [{'model': 'PAY_AS_YOU_GO', 'value': price}, {'model': 'MONTHLY_COMMIT', 'value': price}]
+
+		items.append({
+			'partNumber': part_num, 'shortDisplayName': resource_name, 'currencyCode': 'GBP',
+			'serviceCategoryDisplayName': service_name, 'metricDisplayName': 'Hour', 'prices': prices})
+
+	return {'items': items}
+
+
+# One usagecost item, about 1 in 8 have overage costs (with the wrong unit price) as well as the normal cost
+def usage_item(rand, i):
+	service_name, resource_name, part_num, price = services[i % len(services)]
+	quantity = round(rand.uniform(0.0, 750.0), 3)
+	unit_price = round(price * rand.uniform(0.6, 1.0), 6)
+
+	costs = [{
+		'computedQuantity': quantity, 'unitPrice': unit_price, 'computedAmount': round(quantity * unit_price, 6),
+		'overagesFlag': 'N', 'computeType': 'Usage' if rand.random() < 0.95 else 'Do Not Bill'}]
+
+	if rand.random() < 0.125:
+		overage_quantity = round(rand.uniform(0.0, 100.0), 3)
+		overage_price = round(price * rand.uniform(1.0, 1.5), 6)
+		costs.append({
+			'computedQuantity': overage_quantity, 'unitPrice': overage_price,
+			'computedAmount': round(overage_quantity * overage_price, 6), 'overagesFlag': 'Y', 'computeType': 'Usage'})
+
+	return {
+		'serviceName': service_name, 'resourceName': resource_name, 'resourceDisplayName': resource_name,
+		'gsiProductId': part_num, 'currency': 'GBP', 'dataCenterId': 'eu-frankfurt-1',
+		'startTimeUtc': '2021-06-01T00:00:00.000', 'endTimeUtc': '2021-07-01T00:00:00.000',
+		'costs': costs}
+
+
+# Write the usagecost payload for item_count items (gzip compressed, as served), streamed to keep memory low
+def write_usage_payload(path, item_count):
+	rand = random.Random(seed + item_count)
+
+	with gzip.open(path, 'wt', compresslevel=1) as payload:
+		payload.write('{"accountId": "cacct-bench", "items": [')
+		for i in range(item_count):
+			if i > 0:
+				payload.write(',')
+			payload.write(json.dumps(usage_item(rand, i)))
+		payload.write(']}')
+
+
+def fixture_paths(fixture_dir, item_count):
+	usage_path = os.path.join(fixture_dir, f'usagecost-{item_count}.json.gz')
+	if not os.path.isfile(usage_path):
+		write_usage_payload(usage_path + '.tmp', item_count)
+		os.replace(usage_path + '.tmp', usage_path)
+
+	prices_path = os.path.join(fixture_dir, 'products.json.gz')
+	if not os.path.isfile(prices_path):
+		with gzip.open(prices_path, 'wt') as payload:
+			json.dump(price_list_payload(), payload)
+
+	return usage_path, prices_path
+
+
+# Local stand-in for the metering and price list APIs, serving the pre-compressed payloads
+# /metering/api/v1/usagecost/<item_count>     and    /products
+def start_server(fixture_dir):
+
+	class Handler(SimpleHTTPRequestHandler):
+		def do_GET(self):
+			path = self.path.split('?')[0]
+			if path.startswith('/metering/api/v1/usagecost/'):
+				file_path = os.path.join(fixture_dir, f"usagecost-{path.rsplit('/', 1)[1]}.json.gz")
+			elif path == '/products':
+				file_path = os.path.join(fixture_dir, 'products.json.gz')
+			else:
+				self.send_error(404)
+				return
+
+			with open(file_path, 'rb') as payload:
+				body = payload.read()
+
+			self.send_response(200)
+			self.send_header('Content-Type', 'application/json')
+			self.send_header('Content-Encoding', 'gzip')
+			self.send_header('Content-Length', str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		def log_message(self, format, *args):
+			pass
+
+	server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server
+
+
+# Output stream that notes when the first output row is written
+class RowTimer(io.TextIOBase):
+	def __init__(self, header_lines):
+		self.header_lines = header_lines
+		self.lines = 0
+		self.first_row_time = None
+
+	def write(self, text):
+		if self.first_row_time is None:
+			self.lines += text.count('\n')
+			if self.lines > self.header_lines:
+				self.first_row_time = time.perf_counter()
+		return len(text)
+
+
+# Run one case in this process (called in a subprocess by the benchmark), print the results as JSON
+def run_case(base_url, item_count, detail):
+	import usage_cost_total
+	from ocicloud import metering, pricing
+
+	metering.metering_url = base_url + '/metering/api/v1'
+	usage_cost_total.debug = False
+	usage_cost_total.detail = detail
+	usage_cost_total.output_format = 'CSV'
+	pricing.price_list_url = base_url + '/products'
+
+	# Header line is written for detail output only
+	row_timer = RowTimer(1 if detail else 0)
+	stdout = sys.stdout
+	sys.stdout = row_timer
+
+	start = time.perf_counter()
+	account = {'username': 'user', 'password': 'password', 'domain': str(item_count), 'idcs_guid': 'idcs-bench'}
+	totals = usage_cost_total.get_account_charges('bench', account, datetime(2021, 6, 1), datetime(2021, 7, 1))
+	if not detail:
+		# Totals line, as printed by tenancy_usage()
+		print(f'{"bench":24} {totals[0]:10.2f} (Billed) {totals[1]:10.2f} (Corrected) {totals[2]:10.2f} (List)')
+	end = time.perf_counter()
+
+	sys.stdout = stdout
+	print(json.dumps({
+		'seconds': end - start,
+		'first_row': row_timer.first_row_time - start,
+		'peak_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+		'totals': totals}))
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description='Usage cost benchmark')
+	parser.add_argument('item_counts', nargs='*', type=int, default=[1000, 10000, 100000, 1000000])
+	parser.add_argument('--fixtures', metavar='<dir>', help="Directory for generated payloads (kept for reuse)")
+	parser.add_argument('--run-case', nargs=3, metavar=('URL', 'ITEMS', 'MODE'), help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.run_case is not None:
+		base_url, item_count, mode = args.run_case
+		run_case(base_url, int(item_count), mode == 'detail')
+		sys.exit(0)
+
+	fixture_dir = args.fixtures if args.fixtures is not None else tempfile.mkdtemp(prefix='bench-usage-')
+	os.makedirs(fixture_dir, exist_ok=True)
+
+	for item_count in args.item_counts:
+		fixture_paths(fixture_dir, item_count)
+
+	server = start_server(fixture_dir)
+	base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+	print(f"{'Items':>9} {'Mode':6} {'Secs':>8} {'Items/s':>10} {'FirstRow':>9} {'PeakMB':>8}  Totals (Billed, Corrected, List)")
+	for item_count in args.item_counts:
+		for mode in ('total', 'detail'):
+			result = subprocess.run(
+				[sys.executable, '-m', 'bench.usage_cost', '--run-case', base_url, str(item_count), mode],
+				capture_output=True, text=True, check=True)
+			r = json.loads(result.stdout)
+			totals = ', '.join(f'{t:.6f}' for t in r['totals'])
+			print(f"{item_count:9d} {mode:6} {r['seconds']:8.2f} {item_count / r['seconds']:10.0f} "
+				f"{r['first_row']:9.3f} {r['peak_kb'] / 1024:8.1f}  {totals}")
+
+	server.shutdown()
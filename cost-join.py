@@ -0,0 +1,85 @@
+# cost-join.py
+#
+# Allocate usage costs to compartments and creators (chargeback) by joining usage cost line items
+# to the resource inventory
+#
+# Parameters:
+#		usage_csv		 - usage costs per resource: an OCI Cost and Usage Report CSV (reports/cost-csv in the
+#						   tenancy's usage report bucket), or usage_cost_total.py <tenancy> <start> <end> --detail
+#		inventory_csv	 - one or more resource lists, from: oci-resources.py <profile> (./log/oci-<profile>.csv)
+#		--cost-column	 - usage column to total (default cost/myCost for cost reports, CalcLineCost otherwise)
+#		--trace <file>, --profile (see ocicloud/trace.py)
+#
+# Limitation: usage_cost_total.py --detail output can't really be allocated. The metering API totals usage per
+# SKU, not per resource, and its ResourceName is the SKU name (e.g. PIC_COMPUTE_STANDARD_E4_OCPU), so nearly
+# all its costs are reported as (unallocated). Use a Cost and Usage Report, which has product/resourceId.
+#
+# Output
+#		stdout, cost per compartment and per creator (CreatedBy tag)
+#		csv file (optional)
+#
+# 19-oct-2026	Martin Bridge	Created
+# 19-oct-2026	Martin Bridge	Read OCI Cost and Usage Reports (per resource); warn that metering detail has no resource ids
+# 19-oct-2026	Martin Bridge	--cost-column works with any usage file format; --trace listed with the parameters
+
+import argparse
+import csv
+import sys
+
+from ocicloud import trace
+from ocicloud.join import ResourceIndex, has_resource_ids, join_usage_csv
+
+print_format = '{Group:12s} {Key:80.80s} {Cost:>12.2f}'
+
+
+def print_costs(group, costs, csv_writer):
+	for key, cost in sorted(costs.items(), key=lambda c: -c[1]):
+		print(print_format.format(Group=group, Key=key, Cost=cost))
+		if csv_writer is not None:
+			csv_writer.writerow({'Group': group, 'Key': key, 'Cost': f'{cost:.6f}'})
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description='Join usage costs to OCI resources')
+	parser.add_argument('usage_csv', help="Cost and Usage Report CSV (or usage_cost_total.py --detail output)")
+	parser.add_argument('inventory_csv', nargs='+', help="Resource CSV(s) (oci-resources.py)")
+	parser.add_argument('--cost-column', dest='cost_column',
+						help="Usage cost column to total (default cost/myCost, or CalcLineCost for metering detail)")
+	parser.add_argument('--csv', dest='csv_path', metavar='<file>', help="Also write results to a CSV file")
+	trace.add_arguments(parser)
+
+	args = parser.parse_args()
+	trace.start(args)
+
+	try:
+		if not has_resource_ids(args.usage_csv):
+			print(f'Warning: {args.usage_csv} has no resource ids (metering usage is per SKU, not per resource), '
+				'so most costs will be unallocated. Use an OCI Cost and Usage Report to allocate costs.', file=sys.stderr)
+	except ValueError as error:
+		print(f'Error: {error}', file=sys.stderr)
+		sys.exit(1)
+
+	index = ResourceIndex()
+	for inventory_path in args.inventory_csv:
+		with trace.span('inventory load', file=inventory_path):
+			index.load_csv(inventory_path)
+
+	try:
+		with trace.span('usage join', file=args.usage_csv):
+			compartment_cost, creator_cost, matched, unmatched = join_usage_csv(
+				index, args.usage_csv, args.cost_column)
+	except ValueError as error:
+		print(f'Error: {error}', file=sys.stderr)
+		sys.exit(1)
+
+	csv_writer = None
+	if args.csv_path is not None:
+		csv_file = open(args.csv_path, 'wt')
+		csv_writer = csv.DictWriter(csv_file, lineterminator='\n', fieldnames=['Group', 'Key', 'Cost'])
+		csv_writer.writeheader()
+
+	print(f"{'Group':12s} {'Compartment / CreatedBy':80s} {'Cost':>12s}")
+	print_costs('Compartment', compartment_cost, csv_writer)
+	print_costs('CreatedBy', creator_cost, csv_writer)
+
+	print(f'{index.resource_count} resources, {matched} usage rows matched, {unmatched} unmatched', file=sys.stderr)
@@ -9,7 +9,8 @@
 #           may do strange things!)
 #
 # Parameters:
-#	 	profile_name
+#	 	--trace <file>		Chrome trace event file of the run's phases
+#	 	--profile			Profile the run with cProfile
 #
 # Other parameters picked up from config file using profile name
 #   	username
@@ -26,14 +27,16 @@
 # 17/12/2018 17:16:17              tenant2              GBP        12000.00   11709.24     11709.24       290.76
 #
 # 17-dec-2018   1.0     mbridge     Created
+# 19-oct-2026   1.1     mbridge     Use shared HTTP client (keep-alive, timeouts, retries)
+# 19-oct-2026   1.2     mbridge     Added --trace and --profile options
+# 19-oct-2026   1.3     mbridge     Balances from ocicloud/metering.py (importable, see get_balances)
 #
 
-import configparser
+import argparse
 import datetime
-import json
-import os
 import sys
-import requests
+
+from ocicloud import metering, trace
 
 debug: bool = False
 configfile = '~/.oci/config.ini'
@@ -46,52 +49,39 @@ def print_balance_header():
 
 
 # Use the Oracle REST API to get the account balance for the given tenancy
-def get_account_balance(report_time, tenancy_name, username, password, cloud_acct, idcs_guid):
-
-	resp = requests.get(
-		'https://itra.oraclecloud.com/metering/api/v1/cloudbucks/' + cloud_acct,
-		auth=(username, password),
-		headers={'X-ID-TENANT-NAME': idcs_guid, 'accept-encoding': '*'}
-	)
-
-	if resp.status_code != 200:
-		# This means something went wrong
-		msg = json.loads(resp.text)['errorMessage']
-
-		print('Error in GET: {} ({}) on tenancy {}'.format(resp.status_code, resp.reason, tenancy_name), file=sys.stderr)
-		print('  {}'.format(msg), file=sys.stderr)
-
-	else:
-		i = resp.json()
-		for item in resp.json()['items']:
-
-			# Calculate amt consumed so far
-			consumed = item['purchase'][0]['purchasedResources'][0]['value'] - \
-				item['balance'][0]['purchasedResources'][0]['value']
+def get_account_balance(report_time, tenancy_name, accounts):
 
+	try:
+		for balance in metering.get_balances([tenancy_name], accounts):
 			print("{:24s}{:30s}{:10s}{:>11.2f}{:>11.2f}{:12.2f}".format(
 				report_time.strftime('%d/%m/%Y %H:%M:%S'),
 				tenancy_name,
-				item['purchase'][0]['purchasedResources'][0]['unit'],
-				item['purchase'][0]['purchasedResources'][0]['value'],
-				item['balance'][0]['purchasedResources'][0]['value'],
-				consumed
+				balance.currency,
+				balance.purchased,
+				balance.balance,
+				balance.consumed
 			)
 			)
 
+	except metering.MeteringError as error:
+		# This means something went wrong
+		print('Error in GET: {} ({}) on tenancy {}'.format(error.status_code, error.reason, tenancy_name), file=sys.stderr)
+		print('  {}'.format(error.message), file=sys.stderr)
+
 
 if __name__ == "__main__":
 
-	# In case we use the tilde (~) home directory character
-	configfile = os.path.expanduser(configfile)
+	parser = argparse.ArgumentParser(description='Account balances of all tenancies in the config file')
+	trace.add_arguments(parser)
+	args = parser.parse_args()
+	trace.start(args)
 
-	if not os.path.isfile(configfile):
-		print('Error: Config file not found ({})'.format(configfile), file=sys.stderr)
+	try:
+		config = metering.load_accounts(configfile)
+	except FileNotFoundError as error:
+		print('Error: {}'.format(error), file=sys.stderr)
 		sys.exit(0)
 
-	config = configparser.ConfigParser()
-	config.read(configfile)
-
 	# Timestamp
 	report_time = datetime.datetime.now()
 
@@ -101,15 +91,9 @@ if __name__ == "__main__":
 	# For each tenant in the config file
 	for tenant in config.sections():
 
-		ini_data = config[tenant]
-
-		username = ini_data['username']
-		password = ini_data['password']
-		cloud_acct = ini_data['domain']
-		idcs_guid = ini_data['idcs_guid']
-
 		if debug:
+			ini_data = config[tenant]
 			print('User:Pass = {}:{}   Domain, IDCSID = {}:{}'.format(
-				username, "*" * len(password), cloud_acct, idcs_guid))
+				ini_data['username'], "*" * len(ini_data['password']), ini_data['domain'], ini_data['idcs_guid']))
 
-		get_account_balance(report_time, tenant, username, password, cloud_acct, idcs_guid)
+		get_account_balance(report_time, tenant, config)
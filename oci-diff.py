@@ -0,0 +1,74 @@
+# oci-diff.py
+#
+# Compare two resource inventory snapshots from oci-resources.py and list resources that were added, removed,
+# or changed state, size (OCPU, GBytes) or license (BYOLstatus)
+#
+# oci-resources.py overwrites ./log/oci-<profile>.csv each run, so keep a copy of the previous run to compare, e.g.
+#		cp log/oci-myprofile.csv log/oci-myprofile-prev.csv
+#
+# Parameters:
+#		old_csv, new_csv	 - the two snapshots
+#		--method hash|merge	 - match in memory or by external sort-merge (default: chosen by snapshot size)
+#		--csv <file>		 - also write the differences to a CSV file
+#		--trace <file>, --profile (see ocicloud/trace.py)
+#
+# Output
+#		stdout, readable column format (one line per added/removed resource and per changed field)
+#		csv file (optional)
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import argparse
+import csv
+import sys
+
+from ocicloud import trace
+from ocicloud.diff import ADDED, REMOVED, CHANGED, diff_snapshots
+
+field_names = ['Change', 'Region', 'Compartment', 'Type', 'Name', 'Field', 'Old', 'New', 'OCID']
+print_format = '{Change:8s} {Region:14s} {Compartment:40.40s} {Type:20.20s} {Name:40.40s} ' \
+				'{Field:10s} {Old:>14s} {New:>14s} {OCID}'
+
+
+def output_lines(change, old_row, new_row, deltas):
+	row = old_row if new_row is None else new_row
+	line = {
+		'Change': change, 'Region': row.region, 'Compartment': row.compartment, 'Type': row.type,
+		'Name': row.name, 'Field': '', 'Old': '', 'New': '', 'OCID': row.ocid}
+
+	if change != CHANGED:
+		yield line
+	else:
+		for field, old_value, new_value in deltas:
+			yield dict(line, Field=field, Old=str(old_value), New=str(new_value))
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description='Differences between two OCI resource snapshots')
+	parser.add_argument('old_csv', help="Earlier snapshot (oci-resources.py CSV)")
+	parser.add_argument('new_csv', help="Later snapshot (oci-resources.py CSV)")
+	parser.add_argument('--method', choices=['hash', 'merge'], help="Match in memory (hash) or by sort-merge")
+	parser.add_argument('--csv', dest='csv_path', metavar='<file>', help="Also write differences to a CSV file")
+	trace.add_arguments(parser)
+
+	args = parser.parse_args()
+	trace.start(args)
+
+	csv_writer = None
+	if args.csv_path is not None:
+		csv_file = open(args.csv_path, 'wt')
+		csv_writer = csv.DictWriter(csv_file, lineterminator='\n', fieldnames=field_names)
+		csv_writer.writeheader()
+
+	print(print_format.format(**{f: f for f in field_names}))
+
+	counts = {ADDED: 0, REMOVED: 0, CHANGED: 0}
+	with trace.span('diff', method=args.method):
+		for change, old_row, new_row, deltas in diff_snapshots(args.old_csv, args.new_csv, args.method):
+			counts[change] += 1
+			for line in output_lines(change, old_row, new_row, deltas):
+				print(print_format.format(**line))
+				if csv_writer is not None:
+					csv_writer.writerow(line)
+
+	print(f'{counts[ADDED]} added, {counts[REMOVED]} removed, {counts[CHANGED]} changed', file=sys.stderr)
@@ -9,65 +9,131 @@
 #
 # 20-jan-2020	Martin Bridge	Created
 # 13-apr-2021	Martin Bridge	Output currency code
+# 19-oct-2026	Martin Bridge	Show all price bands instead of the lowest price
+# 19-oct-2026	Martin Bridge	Added --trace and --profile options
+# 19-oct-2026	Martin Bridge	Several currencies (--currency), fetched concurrently; --index, --csv, --json and --lookup
+#
+# Output:
+#	PartNum|Category|Name|Metric|PAYG_price|Month_price|Currency, one line per SKU and currency
+#	--index <file>	binary price index (see ocicloud/priceindex.py) for instant SKU lookups by other tools
+#	--csv <file>	CSV, one row per SKU with PAYG and monthly price columns for each currency
+#	--json <file>	JSON, {part number: {name, category, metric, prices: {currency: {model: [[from, price], ...]}}}}
+#	--lookup <SKU>	prices of the SKU from an existing index (--index), without calling the price list API
+
+import argparse
+import csv
+import json
+import sys
+
+from ocicloud import pricing, priceindex, trace
 
-import requests
+default_index = './log/oci-prices.idx'
 
 
-def print_price_list(currency_code):
+# Readable bands, e.g. 0.0<10240;0.0085 (free for the first 10240, then 0.0085)
+# Some items are free and have no price (e.g. 'B94418 - Oracle Cloud Program - ... - Research Cloud Starter')
+def price_text(bands):
+	return 'n/a' if bands is None else str(bands)
+
+
+def print_price_list(catalogue, currency_codes):
 
 	# Example requests
 	# https://itra.oraclecloud.com/itas/.anon/myservices/api/v1/products/10089
 	# https://itra.oraclecloud.com/itas/.anon/myservices/api/v1/products?parentProductPartNumber=B88206&limit=500
 	# https://itra.oraclecloud.com/itas/.anon/myservices/api/v1/products?partNumber=B91128
 
-	url = "https://itra.oraclecloud.com/itas/.anon/myservices/api/v1/products?limit=500"
-	http_header = {'X-Oracle-Accept-CurrencyCode': currency_code}
-	resp = requests.get(url, headers=http_header)
-
 	# Columns headings
-	print("PartNum|Category|Name|Metric|PAYG_price|Month_price|Currency}")
-
-	nitems = 0
-	items = resp.json()['items']
-	for item in items:
-		nitems += 1
-		# print(f"{item['displayName']:160} - {item['prices']}")
-
-		# Some items do not have serviceCategoryDisplayName
-		part_num = item['partNumber']
-		name = item['shortDisplayName']
-		currency = item['currencyCode']
-		try:
-			category = item['serviceCategoryDisplayName']
-		except KeyError:
-			category = "None"
-		try:
-			metric = item['metricDisplayName']
-		except KeyError:
-			metric = "None"
-
-		# Some items have a banded price, free up to a limit, then a charge beyond
-		# For simplicity, use the lowest price
-		payg_price = 1000000
-		month_price = 1000000
-		# Some items are free and have no price (e.g. 'B94418 - Oracle Cloud Program - ... - Research Cloud Starter')
-		if 'prices' in item:
-			for price in item['prices']:
-				if price['model'] == 'PAY_AS_YOU_GO':
-					if float(price['value']) < payg_price:
-						payg_price = float(price['value'])
-				elif price['model'] == 'MONTHLY_COMMIT':
-					if float(price['value']) < month_price:
-						month_price = float(price['value'])
-		else:
-			payg_price = 'n/a'
-			month_price = 'n/a'
-
-		print(f"{part_num}|{category}|{name}|{metric}|{payg_price}|{month_price}|{currency}")
-
-	print(f"{nitems} SKUs found")
+	lines = ["PartNum|Category|Name|Metric|PAYG_price|Month_price|Currency"]
+
+	with trace.span('output', items=len(catalogue)):
+		for part_num, sku in catalogue.items():
+			for currency in currency_codes:
+				prices = sku['prices'].get(currency)
+				if prices is None:
+					continue
+				payg_price = price_text(prices.get(pricing.PAYG))
+				month_price = price_text(prices.get(pricing.MONTHLY))
+				lines.append(
+					f"{part_num}|{sku['category']}|{sku['name']}|{sku['metric']}|{payg_price}|{month_price}|{currency}")
+
+		lines.append(f"{len(catalogue)} SKUs found")
+		sys.stdout.write('\n'.join(lines) + '\n')
+
+
+def write_csv(path, catalogue, currency_codes):
+	field_names = ['PartNum', 'Category', 'Name', 'Metric']
+	for currency in currency_codes:
+		field_names += [f'PAYG_{currency}', f'Month_{currency}']
+
+	with trace.span('csv export', path=path), open(path, 'wt', newline='') as csv_file:
+		csv_writer = csv.writer(csv_file, lineterminator='\n', dialect='excel')
+		csv_writer.writerow(field_names)
+		for part_num, sku in sorted(catalogue.items()):
+			row = [part_num, sku['category'], sku['name'], sku['metric']]
+			for currency in currency_codes:
+				prices = sku['prices'].get(currency, {})
+				row += [price_text(prices.get(pricing.PAYG)), price_text(prices.get(pricing.MONTHLY))]
+			csv_writer.writerow(row)
+
+
+def write_json(path, catalogue):
+	# Bands as [from quantity, unit price] pairs
+	skus = {}
+	for part_num, sku in sorted(catalogue.items()):
+		skus[part_num] = dict(sku, prices={
+			currency: {model: [list(b) for b in zip(bands.lower, bands.prices)] for model, bands in prices.items()}
+			for currency, prices in sku['prices'].items()})
+
+	with trace.span('json export', path=path), open(path, 'wt') as json_file:
+		json.dump(skus, json_file, indent=1)
+
+
+# Prices of one SKU from an existing index
+def print_lookup(index_path, part_num):
+	with priceindex.PriceIndex(index_path) as index:
+		sku = index.lookup(part_num)
+		if sku is None:
+			print(f"{part_num} not found in {index_path}")
+			return 1
+
+		print("PartNum|Category|Name|Metric|PAYG_price|Month_price|Currency")
+		for currency in index.currencies:
+			prices = sku['prices'][currency]
+			payg_price = price_text(prices.get(pricing.PAYG))
+			month_price = price_text(prices.get(pricing.MONTHLY))
+			print(f"{part_num}|{sku['category']}|{sku['name']}|{sku['metric']}|{payg_price}|{month_price}|{currency}")
+	return 0
 
 
 if __name__ == "__main__":
 
-	print_price_list("GBP")
+	parser = argparse.ArgumentParser(description='OCI Universal Credit prices')
+	parser.add_argument('--currency', action='append', dest='currencies', metavar='<code>',
+						help='Currency code (repeat for several currencies, default GBP)')
+	parser.add_argument('--index', nargs='?', const=default_index, metavar='<file>',
+						help=f'Write a binary price index (default {default_index})')
+	parser.add_argument('--csv', dest='csv_file', metavar='<file>', help='Write the prices as CSV')
+	parser.add_argument('--json', dest='json_file', metavar='<file>', help='Write the prices as JSON')
+	parser.add_argument('--lookup', metavar='<SKU>', help='Show the prices of a SKU from the price index')
+	trace.add_arguments(parser)
+	args = parser.parse_args()
+	trace.start(args)
+
+	if args.lookup is not None:
+		sys.exit(print_lookup(args.index or default_index, args.lookup))
+
+	currencies = [c.upper() for c in args.currencies or ['GBP']]
+
+	with trace.span('price list fetch', currencies=','.join(currencies)):
+		price_catalogue = pricing.get_price_catalogue(currencies)
+
+	if args.index is not None:
+		with trace.span('index write', path=args.index):
+			priceindex.write_index(args.index, price_catalogue, currencies)
+	if args.csv_file is not None:
+		write_csv(args.csv_file, price_catalogue, currencies)
+	if args.json_file is not None:
+		write_json(args.json_file, price_catalogue)
+
+	print_price_list(price_catalogue, currencies)
@@ -4,10 +4,30 @@
 # 		profile_name
 # 		(credentials are then picked up from the config file)
 #       -c <compartment_id> - only show resources within this compartment and any subcompartments
+#       --resume            - continue an interrupted scan from the last checkpoint in the journal
+#       --summary           - only print totals (OCPU, GBytes, NON-BYOL, unattached volumes) per compartment, region
+#                             and type, no row per resource (no checkpoints, so --resume does not apply)
+#       --storage-metrics   - size buckets and file systems from Monitoring metrics, a few requests per compartment
+#                             rather than one per bucket/file system (see ocicloud/metrics.py)
+#       --trace <file>, --profile (see ocicloud/trace.py)
+#       Filters (each can be repeated, any of the values matches):
+#       --type <type>                   - resource type, e.g. instance, autonomousdatabase
+#       --region <region>               - region name, e.g. eu-frankfurt-1
+#       --state <state>                 - lifecycle state, e.g. RUNNING
+#       --tag <namespace.key[=value]>   - defined tag, with any value if none given (all --tag filters must match)
+#       --created-by <user>             - Owner.Creator tag (without the oracleidentitycloudservice/ prefix)
+#       Sharded execution (see run_coordinator):
+#       --coordinator <queue file>      - split the scan into units of work in a queue file, wait for workers to
+#                                         run them, then merge their output into the usual CSV file
+#       --workers <n>                   - number of local worker processes the coordinator starts (default 0)
+#       --worker <queue file>           - run units of work from the queue (on this or another host)
+#                                         Units are planned from the stats of earlier runs (see ocicloud/schedule.py)
 #
 # Output
 # 		stdout, readable column format
 # 		csv file
+# 		stats file (resource counts and times per region and type, when the whole tenancy is listed unfiltered)
+# 		summary csv file (--summary)
 #
 # 16-nov-2018   Martin Bridge   Created
 # 06-sep-2019	Martin Bridge   Added detection of Non-BYOL database instances
@@ -21,17 +41,35 @@
 #                               Calculate object storage size
 # 12-apr-2021	Martin Bridge   Add compartment_id command line option
 # 14-jan-2022   Martin Bridge   FIXED: Limit of 500 resources reported per region. Pagination for resource search added
+# 19-oct-2026   Martin Bridge   Checkpoint completed regions/search pages in a journal, --resume to continue a failed scan
+# 19-oct-2026   Martin Bridge   Compact InventoryRow (ocicloud/inventory.py) instead of a dictionary per resource
+# 19-oct-2026   Martin Bridge   Added --trace and --profile options
+# 19-oct-2026   Martin Bridge   Filters for type, region, state, tag and creator, pushed into the search query
+# 19-oct-2026   Martin Bridge   Coordinator/worker mode to shard a scan over several processes or hosts
+# 19-oct-2026   Martin Bridge   Search and enrichment moved to ocicloud/resources.py (importable, see iter_resources)
+# 19-oct-2026   Martin Bridge   Record resource counts/times per region and type, used to plan sharded scans
+# 19-oct-2026   Martin Bridge   Added --summary (rollup totals only, see ocicloud/summary.py)
+# 19-oct-2026   Martin Bridge   Added --storage-metrics (bucket and file system sizes from Monitoring metrics)
+# 19-oct-2026   Martin Bridge   --resume with --coordinator releases units claimed by stopped workers
+# 19-oct-2026   Martin Bridge   Trace output per search page rather than per row
+# 19-oct-2026   Martin Bridge   --tag without =value matches any value of the tag
 #
 
 import argparse
 import csv
+import json
+import os
 import re
+import subprocess
 import sys
 import time
 from string import Formatter
 
 import oci
 
+from ocicloud import resources, schedule, summary, trace, workqueue
+from ocicloud.inventory import field_names
+
 # Enable debug logging
 # import logging
 # logging.basicConfig()
@@ -41,11 +79,10 @@ import oci
 ################################################################################################
 debug = False
 output_dir = "./log"
+storage_metrics = False     # Bucket and file system sizes from Monitoring metrics (--storage-metrics)
 ################################################################################################
 
-# Output formats for readable, columns style output and csv files
-field_names = ['Tenancy', 'Region', 'Compartment', 'Type', 'Name', 'State', 'DB',
-				'Shape', 'OCPU', 'GBytes', 'BYOLstatus',	'VolAttached', 'Created', 'CreatedBy', 'OCID']
+# Output formats for readable, columns style output and csv files (column names in field_names)
 print_format = '{Tenancy:24s} {Region:14s} {Compartment:54s} {Type:26s} {Name:54.54s} {State:18s} {DB:4s} ' \
 				'{Shape:20s} {OCPU:4d} {GBytes:>8.3f} {BYOLstatus:10s} {VolAttached:12s} {Created:32s} {CreatedBy:32s} {OCID:120}'
 
@@ -55,9 +92,23 @@ header_format = re.sub('\.[0-9]*', '', header_format)     # Remove decimal
 header_format = re.sub('f}', 's}', header_format)     # replace float w. string
 header_format = re.sub('d}', 's}', header_format)     # replace decimal w. string
 
-# Fixed strings
-BYOL = "BYOL"
-NONBYOL = "*NON-BYOL*"
+# Summary (--summary) output formats
+summary_compartment_format = '{:70.70s} {:>9d} {:>7d} {:>12.3f} {:>8d} {:>10d}'
+summary_region_type_format = '{:14s} {:55.55s} {:>9d} {:>7d} {:>12.3f} {:>8d} {:>10d}'
+summary_headings = ('Resources', 'OCPU', 'GBytes', 'NonBYOL', 'Unattached')
+
+# Resource types that are searched together in one unit of work when a scan is sharded (see run_coordinator)
+# Volumes are not split by compartment, so instance attachments are only looked up once per region
+type_groups = [
+	['instance', 'image'],
+	['volume', 'bootvolume'],
+	['bootvolumebackup', 'volumebackup', 'volumegroup', 'volumegroupbackup'],
+	['autonomousdatabase', 'autonomouscontainerdatabase', 'database', 'dbsystem', 'odainstance',
+		'datasafeprivateendpoint'],
+	['bucket', 'filesystem', 'mounttarget'],
+]
+unchunked_types = ['volume', 'bootvolume']
+compartment_chunk_size = 50     # Compartments per unit of work
 
 
 def debug_out(out_str):
@@ -65,338 +116,168 @@ def debug_out(out_str):
 		print(out_str)
 
 
-# Get compartment full name (path) from the compartment list dictionary
-def get_compartment_name(compartment_id, compartment_list):
-	for comp in compartment_list:
-		if comp['id'] == compartment_id:
-			return comp['path']
-	return 'Not Found'
+# Search and list all resources in one region
+# query_compartment_ids limits the search to those compartments (None for the whole tenancy)
+# Counts and times per resource type are added to stats when the region is searched from start to finish
+def list_region_resources(
+		region_name, query_compartment_ids, filters, journal, csv_file, csv_writer, written_ocids, stats):
+	try:
+		# Carry on from the last checkpointed page of this region, if any (written OCIDs are skipped)
+		start_page = journal['pages'].get(region_name)
+		pages = resources.iter_region_pages(
+			tenancy, region_name, filters, query_compartment_ids, start_page, written_ocids, storage_metrics)
+
+		# Types searched but not found are counted too, so they are known to be cheap
+		region_stats = {region_name: {
+			t: {'count': 0, 'seconds': 0.0} for t in resources.get_region_resource_types(region_name, filters)}}
+		row_time = time.time()
+
+		for rows, next_page in pages:
+			with trace.span('output', rows=len(rows)):
+				for row in rows:
+					debug_out(f'ID: {row.ocid}, Type: {row.type}')
+					format_output(csv_writer, row)
+					written_ocids.add(row.ocid)
+
+					# Time since the last row (includes the search request for the first row of a page)
+					now = time.time()
+					schedule.add_row(region_stats, region_name, row.type, now - row_time)
+					row_time = now
+
+			# Checkpoint: rows for this page are on disk, so record where to carry on from
+			csv_file.flush()
+			if next_page is not None:
+				journal_write(journal, {'region': region_name, 'page': next_page})
+
+		journal_write(journal, {'region': region_name, 'done': True})
+		if start_page is None:
+			schedule.merge_stats(stats, region_stats)
 
+	except oci.exceptions.ServiceError as e:
+		print(f"Error: {e.code}, {e.message}  (region={region_name})", file=sys.stderr)
 
-def list_tenancy_resources(compartment_list, base_compartment_id):
-	global tenancy_name
-	global regions
-	global config
+	except Exception as error:
+		print(f'Error: {error}', file=sys.stderr)
 
+
+def list_tenancy_resources(compartment_list, base_compartment_id, resume, filters=resources.no_filters):
 	# Headings
 	vformat = Formatter().vformat
 	print(vformat(header_format, field_names, ''))
 
+	# Journal of completed regions and search pages, so an interrupted scan can be resumed
+	# OCIDs already written to the CSV file are skipped, so each resource is only output once
+	journal = journal_open(f"oci-{profile_name}", base_compartment_id, filters, resume)
+
 	# CSV output
-	csv_writer = csv_open(f"oci-{profile_name}")
+	csv_file, csv_writer, written_ocids = csv_open(f"oci-{profile_name}", resume)
+
+	query_compartment_ids = None if base_compartment_id is None else [c['id'] for c in compartment_list]
+	run_stats = {}
 
 	# Search all resources
-	# for region in (r for r in regions if r.region_name == 'eu-frankfurt-1'):
-	for region in regions:
-
-		config['region'] = region.region_name
-		resource_search_client = oci.resource_search.ResourceSearchClient(config)
-		db_client = oci.database.DatabaseClient(config)
-		compute_client = oci.core.ComputeClient(config)
-		analytics_client = oci.analytics.AnalyticsClient(config)
-		integration_client = oci.integration.IntegrationInstanceClient(config)
-		block_storage_client = oci.core.BlockstorageClient(config)
-		object_store_client = oci.object_storage.ObjectStorageClient(config)
-		file_storage_client = oci.file_storage.FileStorageClient(config)
-		attached_volumes = []
-
-		# When the base compartment is not the tenancy root, filter on list of
-		# supplied compartment_ids from compartment_list
-		# This builds up the where clause for the query string
-		compartment_filter = ''
-		if base_compartment_id is not None:
-			first = True
-			for c in compartment_list:
-				if not first:
-					compartment_filter += ' || '
-				else:
-					first = False
-				compartment_filter += f" compartmentId = '{c['id']}'"
+	# Regions not in the region filter are skipped before any clients are created
+	scan_regions = [r for r in tenancy.regions if filters['regions'] is None or r in filters['regions']]
+	for region_name in scan_regions:
 
-		try:
+		if region_name in journal['done']:
+			debug_out(f'Skipping {region_name} (completed in previous run)')
+			continue
 
-			# Get a list of all instances and the volumes attached to them so we can later spot volumes that are unattached
-			instance_search_spec = oci.resource_search.models.StructuredSearchDetails()
-			query_string = 'query Instance resources'
-			if compartment_filter != '':
-				query_string += ' where ' + compartment_filter
-
-			instance_search_spec.query = query_string
-			instances = resource_search_client.search_resources(search_details=instance_search_spec).data
-
-			for instance in instances.items:
-				compartment_id = instance.compartment_id
-				instance_id = instance.identifier
-				availability_domain = instance.availability_domain
-
-				# Find all volumes attached to instances
-				volume_attachments = oci.pagination.list_call_get_all_results(
-					compute_client.list_volume_attachments,
-					compartment_id=compartment_id,
-					instance_id=instance_id
-				).data
-
-				# Find all boot volumes attached
-				boot_volume_attachments = oci.pagination.list_call_get_all_results(
-					compute_client.list_boot_volume_attachments,
-					compartment_id=compartment_id,
-					instance_id=instance_id,
-					availability_domain=availability_domain
-				).data
-
-				# looping through all the volumes/bootVol attached and add it to the list
-				for volume in volume_attachments:
-					attached_volumes.append(volume.volume_id)
-
-				for bootVolume in boot_volume_attachments:
-					attached_volumes.append(bootVolume.boot_volume_id)
-
-			# TODO: ADD:
-			# ApiGateway 1M msgs/month
-			# OKE
-			# DataSafePrivateEndpoint (endpoints per month)
-			# bastion
-
-			resource_types = [
-				'autonomousdatabase', 'autonomouscontainerdatabase', 'analyticsinstance',
-				'bootvolume', 'bootvolumebackup', 'bucket', 'database', 'dbsystem',
-				'datasafeprivateendpoint', 'loadbalancer', 'volumegroup',
-				'apigateway', 'apideployment',
-				'datasciencemodel', 'datasciencenotebooksession', 'datascienceproject',
-				'filesystem', 'functionsapplication', 'functionsfunction',
-				'image', 'instance', 'integrationinstance',
-				'mounttarget', 'oceinstance',
-				'odainstance', 'vault', 'vaultsecret', 'volume', 'volumegroup', 'volumebackup', 'volumegroupbackup'
-			]
-			# resource_types = ['all']
-
-			# Some regions don't have all resource types, and query fails, so excelude certain types
-			try:
-				if region.region_name == 'us-sanjose-1':
-					resource_types.remove('oceinstance')
-					# resource_types.remove('datasciencemodel')
-					# resource_types.remove('datasciencenotebooksession')
-					# resource_types.remove('datascienceproject')
-				elif region.region_name == 'eu-milan-1':
-					resource_types.remove('oceinstance')
-				elif region.region_name == 'eu-stockholm-1':
-					resource_types.remove('oceinstance')
-			except ValueError:
-				pass  # ignore value errors
-
-			resource_type_list = ', '.join(resource_types)   # To comma sep string
-
-			# Not interested in terminated resources
-			query_filter = "where lifecycleState != 'DELETED' "
-			query_filter += "&& lifecycleState != 'TERMINATED' "
-			query_filter += "&& lifecycleState != 'Terminated' "
-			if compartment_filter != "":
-				query_filter += " && (" + compartment_filter + ") "
-			query_filter += "sorted by compartmentId asc"
-
-			search_spec = oci.resource_search.models.StructuredSearchDetails()
-			search_spec.query = f"query {resource_type_list} resources {query_filter}"
-
-			resources = oci.pagination.list_call_get_all_results(
-				resource_search_client.search_resources,
-				search_details=search_spec
-			).data
-
-			# Skip compartments as a resource type (OCI where clause doesn't seem to support this filter)
-			exclude_types = ['Compartment', 'User']
-			resource_generator = (r for r in resources if r.resource_type not in exclude_types)
-			for resource in resource_generator:
-
-				debug_out(f'ID: {resource.identifier}, Type: {resource.resource_type}')
-
-				# Some items do not have a display name (eg. Tag Namespace)
-				resource_name = '-' if resource.display_name is None else resource.display_name
-
-				db_workload = ''
-				shape = ''
-				cpu_core_count = 0
-				storage_gbs = 0.0
-				byol_flag = ''
-				volume_attachment_flag = ''
-
-				# Dynamic tag used to identify creator, missing on some resources
-				created_by = ''
-				try:
-					# Only interested in tracking down the creator (person), so strip off the
-					# oracleidentitycloudservice/ before the username
-					created_by = resource.defined_tags['Owner']['Creator'].replace('oracleidentitycloudservice/', '')
-				except:
-					# Ignore all errors such as tag missing
-					pass
-
-				# Some items do not return a lifecycle state (eg. Tags)
-				state = '-' if resource.lifecycle_state is None else resource.lifecycle_state
-
-				compartment_name = get_compartment_name(resource.compartment_id, compartment_list)
-
-				if resource.resource_type == 'Instance':
-					resource_detail = compute_client.get_instance(resource.identifier).data
-					shape = resource_detail.shape
-					cpu_core_count = int(resource_detail.shape_config.ocpus)
-
-				if resource.resource_type == 'Bucket':
-					namespace = object_store_client.get_namespace().data
-					fields = ['approximateCount', 'approximateSize']
-					resource_detail = object_store_client.get_bucket(namespace, resource.display_name, fields=fields).data
-					storage_gbs = resource_detail.approximate_size / 1e9   # Bytes to Gigabytes
-
-				if resource.resource_type == 'FileSystem':
-					resource_detail = file_storage_client.get_file_system(resource.identifier).data
-					storage_gbs = resource_detail.metered_bytes / 1e9      # Bytes to Gigabytes
-
-				elif resource.resource_type == 'AutonomousDatabase':
-					resource_detail = db_client.get_autonomous_database(resource.identifier).data
-					db_workload = resource_detail.db_workload
-					cpu_core_count = resource_detail.cpu_core_count
-					storage_gbs = resource_detail.data_storage_size_in_tbs * 1024.0
-					byol_flag = BYOL if resource_detail.license_model == "BRING_YOUR_OWN_LICENSE" else NONBYOL
-
-				elif resource.resource_type == 'Database':
-					resource_detail = db_client.get_database(resource.identifier).data
-					resource_name = resource_detail.db_name
-
-				elif resource.resource_type == 'DbSystem':
-					resource_detail = db_client.get_db_system(resource.identifier).data
-					shape = resource_detail.shape
-					storage_gbs = float(resource_detail.data_storage_size_in_gbs)
-					cpu_core_count = resource_detail.cpu_core_count
-					node_count = resource_detail.node_count
-
-					# Get status of DB Node instead of the dbsystem
-					# This more accurately reflects the status of the DB Server
-					node_list = db_client.list_db_nodes(resource.compartment_id, db_system_id=resource.identifier)
-
-					state = 'STOPPED (NODE)'
-					for node in node_list.data:
-						if node.lifecycle_state == 'AVAILABLE':
-							state = 'AVAILABLE(NODE)'
-
-					if node_count is not None and node_count > 1:
-						shape = shape + '(x' + str(node_count) + ')'
-
-					byol_flag = BYOL if resource_detail.license_model == "BRING_YOUR_OWN_LICENSE" else NONBYOL
-
-				elif resource.resource_type == 'Volume':
-					resource_detail = block_storage_client.get_volume(resource.identifier).data
-					storage_gbs = float(resource_detail.size_in_gbs)
-
-				elif resource.resource_type == 'BootVolume':
-					resource_detail = block_storage_client.get_boot_volume(resource.identifier).data
-					storage_gbs = float(resource_detail.size_in_gbs)
-
-				elif resource.resource_type == 'BootVolumeBackup':
-					resource_detail = block_storage_client.get_boot_volume_backup(resource.identifier).data
-					storage_gbs = float(resource_detail.size_in_gbs)
-
-				elif resource.resource_type == 'AnalyticsInstance':
-					resource_detail = analytics_client.get_analytics_instance(resource.identifier).data
-					if resource_detail.capacity.capacity_type == 'OLPU_COUNT':
-						cpu_core_count = int(resource_detail.capacity.capacity_value)
-					byol_flag = BYOL if resource_detail.license_type == "BRING_YOUR_OWN_LICENSE" else NONBYOL
-
-				elif resource.resource_type == 'IntegrationInstance':
-					resource_detail = integration_client.get_integration_instance(resource.identifier).data
-					byol_flag = BYOL if resource_detail.is_byol else NONBYOL
-
-				# Check if volumes are in use
-				if resource.resource_type == 'Volume' or resource.resource_type == 'BootVolume':
-					volume_attachment_flag = "Attached" if resource.identifier in attached_volumes else "Not Attached"
-
-				output_dict = {
-					'Tenancy': tenancy_name,
-					'Region': region.region_name,
-					'Compartment': compartment_name,
-					'Type': resource.resource_type,
-					'Name': resource_name,
-					'State': state,
-					'DB': db_workload,
-					'Shape': shape,
-					'OCPU': cpu_core_count,
-					'GBytes': storage_gbs,
-					'BYOLstatus': byol_flag,
-					'VolAttached': volume_attachment_flag,
-					'Created': resource.time_created.strftime("%Y-%m-%d %H:%M:%S"),
-					'CreatedBy': created_by,
-					'OCID': resource.identifier
-				}
-
-				format_output(csv_writer, output_dict)
-
-		except oci.exceptions.ServiceError as e:
-			print(f"Error: {e.code}, {e.message}  (region={region.region_name})", file=sys.stderr)
+		with trace.span('region', region=region_name):
+			list_region_resources(
+				region_name, query_compartment_ids, filters, journal, csv_file, csv_writer, written_ocids, run_stats)
 
-		except Exception as error:
-			print(f'Error: {error}', file=sys.stderr)
+	csv_file.close()
 
-	return
+	if records_stats(base_compartment_id, filters):
+		schedule.save_stats(stats_path(), run_stats)
 
+	incomplete = [r for r in scan_regions if r not in journal['done']]
+	if len(incomplete) > 0:
+		print(f'Incomplete regions: {", ".join(incomplete)} (run again with --resume to complete)', file=sys.stderr)
+
+	return
 
-# Traverse the compartment list to build the full compartment path
-def traverse(compartments, parent_id, parent_path, compartment_list):
-	next_level_compartments = [c for c in compartments if c.compartment_id == parent_id]
 
-	for compartment in next_level_compartments:
-		# Skip the CASB compartment as it's only a proxy and throws an error
-		# CASB compartment does not show up in the OCI console
-		# Only look at ACTIVE compartments (deleted ones are still returned and throw permission errors)
-		if compartment.name[0:17] != 'casb_compartment.' and compartment.lifecycle_state == 'ACTIVE':
-			path = parent_path + '/' + compartment.name
-			compartment_list.append(
-				dict(id=compartment.id, name=compartment.name, path=path, state=compartment.lifecycle_state)
-			)
-			traverse(compartments, parent_id=compartment.id, parent_path=path, compartment_list=compartment_list)
-	return compartment_list
+# Totals of all resources per compartment (including sub-compartments), region and type, without listing each one
+def summarise_tenancy_resources(compartment_list, base_compartment_id, filters):
+	tenancy_summary = summary.Summary()
+	query_compartment_ids = None if base_compartment_id is None else [c['id'] for c in compartment_list]
 
+	scan_regions = [r for r in tenancy.regions if filters['regions'] is None or r in filters['regions']]
+	incomplete = []
+	for region_name in scan_regions:
+		with trace.span('region', region=region_name):
+			# Rows of a region are only added to the totals once the whole region has been scanned
+			region_summary = summary.Summary()
+			try:
+				pages = resources.iter_region_pages(
+					tenancy, region_name, filters, query_compartment_ids, storage_metrics=storage_metrics)
+				for rows, _ in pages:
+					for row in rows:
+						region_summary.add_row(row)
+				tenancy_summary.merge(region_summary)
 
-def get_compartment_list(profile, base_compartment_id):
-	global tenancy_name
-	global regions
-	global ADs
-	global config
+			except oci.exceptions.ServiceError as e:
+				print(f"Error: {e.code}, {e.message}  (region={region_name})", file=sys.stderr)
+				incomplete.append(region_name)
 
-	# Load config data from ~/.oci/config
-	config = oci.config.from_file(profile_name=profile)
-	tenancy_id = config['tenancy']
+			except Exception as error:
+				print(f'Error: {error}', file=sys.stderr)
+				incomplete.append(region_name)
 
-	identity = oci.identity.IdentityClient(config)
-	tenancy_name = identity.get_tenancy(tenancy_id).data.name
+	with trace.span('output'):
+		print(f"{'Compartment':70s} {'{:>9s} {:>7s} {:>12s} {:>8s} {:>10s}'.format(*summary_headings)}")
+		for compartment, totals in tenancy_summary.compartment_totals():
+			# Indented by depth in the compartment tree
+			depth = compartment.count('/') - 1
+			print(summary_compartment_format.format('  ' * depth + compartment, *totals.values()))
 
-	# Get Regions
-	regions = identity.list_region_subscriptions(tenancy_id).data
+		print()
+		print(f"{'Region':14s} {'Type':55s} {'{:>9s} {:>7s} {:>12s} {:>8s} {:>10s}'.format(*summary_headings)}")
+		for (region_name, resource_type), totals in tenancy_summary.region_type_totals():
+			print(summary_region_type_format.format(region_name, resource_type, *totals.values()))
+		print(summary_region_type_format.format('Total', '', *tenancy_summary.grand_total().values()))
 
-	if base_compartment_id is None:
-		base_compartment_id = tenancy_id
+		with open(f'{output_dir}/oci-{profile_name}-summary.csv', 'wt') as csv_file:
+			csv_writer = csv.DictWriter(csv_file, lineterminator='\n', fieldnames=summary.field_names, dialect='excel')
+			csv_writer.writeheader()
+			csv_writer.writerows(tenancy_summary.csv_rows())
 
-	# Get list of all compartments in tenancy
-	compartments = oci.pagination.list_call_get_all_results(
-		identity.list_compartments, tenancy_id,
-		compartment_id_in_subtree=True).data
+	if len(incomplete) > 0:
+		print(f'Incomplete regions: {", ".join(incomplete)} (totals do not include them)', file=sys.stderr)
 
-	comp = identity.get_compartment(base_compartment_id).data
-	base_compartment_name = comp.name
-	base_path = '/' + base_compartment_name
 
-	# Got the flat list of compartments, now construct full path of each which makes it much easier to locate resources
-	# Start with base compartment in dictionary
-	compartment_path_list = [dict(id=base_compartment_id, name=base_compartment_name, path=base_path, state='Root')]
+# Stats are only recorded for scans of the whole tenancy that list all resources of the types and regions searched
+def records_stats(base_compartment_id, filters):
+	return base_compartment_id is None and all(filters[f] is None for f in ('states', 'tags', 'creators'))
 
-	# Recurse through all compartments starting at the required root to produce a sub-tree
-	# with a path field like: /root/comp1/sub-comp1 etc.
-	compartment_path_list = traverse(compartments, base_compartment_id, base_path, compartment_path_list)
-	compartment_path_list = sorted(compartment_path_list, key=lambda c: c['path'].lower())
 
-	return compartment_path_list
+def stats_path():
+	return f'{output_dir}/oci-{profile_name}.stats.json'
 
 
-def csv_open(filename):
+# Open the CSV output file, returns the file, the csv writer and the set of OCIDs already in the file
+# When resuming, rows from the previous run are kept (less any partly written last row) and new rows appended
+def csv_open(filename, resume=False):
 	csv_path = f'{output_dir}/{filename}.csv'
 
-	csv_file = open(csv_path, 'wt')
+	written_ocids = set()
+	if resume and os.path.isfile(csv_path):
+		with open(csv_path, 'rt', newline='') as csv_file:
+			complete_rows = csv_file.read().rpartition('\n')[0] + '\n'
+
+		with open(csv_path, 'wt', newline='') as csv_file:
+			csv_file.write(complete_rows)
+
+		with open(csv_path, 'rt', newline='') as csv_file:
+			written_ocids = {row['OCID'] for row in csv.DictReader(csv_file)}
+
+		csv_file = open(csv_path, 'at')
+	else:
+		resume = False
+		csv_file = open(csv_path, 'wt')
 
 	if debug:
 		print('CSV File : ' + csv_path)
@@ -408,13 +289,52 @@ def csv_open(filename):
 		dialect='excel',
 		quotechar='"', quoting=csv.QUOTE_MINIMAL)
 
-	csv_writer.writeheader()
+	if not resume:
+		csv_writer.writeheader()
+
+	return csv_file, csv_writer, written_ocids
+
+
+# Open the checkpoint journal (JSON lines, one per completed search page or region)
+# Returns the journal state: completed regions and the next page token for partly completed regions
+def journal_open(filename, base_compartment_id, filters, resume):
+	journal_path = f'{output_dir}/{filename}.journal'
+	scan = {'compartment_id': base_compartment_id, 'filters': filters}
+	journal = {'path': journal_path, 'done': set(), 'pages': {}}
+
+	if resume and os.path.isfile(journal_path):
+		with open(journal_path, 'rt') as journal_file:
+			entries = [json.loads(line) for line in journal_file if line.endswith('\n')]
+
+		if len(entries) > 0 and entries[0] != scan:
+			print(f'Error: Journal {journal_path} is for a different scan ({entries[0]}), cannot resume', file=sys.stderr)
+			sys.exit(1)
+
+		for entry in entries[1:]:
+			if entry.get('done'):
+				journal['done'].add(entry['region'])
+				journal['pages'].pop(entry['region'], None)
+			else:
+				journal['pages'][entry['region']] = entry['page']
+	else:
+		# New scan, start a new journal
+		with open(journal_path, 'wt') as journal_file:
+			journal_file.write(json.dumps(scan) + '\n')
+
+	return journal
 
-	return csv_writer
 
+def journal_write(journal, entry):
+	with open(journal['path'], 'at') as journal_file:
+		journal_file.write(json.dumps(entry) + '\n')
 
-# Output a line for each cloud resource (output_dict should be a dictionary)
-def format_output(csv_writer, output_dict):
+	if entry.get('done'):
+		journal['done'].add(entry['region'])
+
+
+# Output a line for each cloud resource (row is an InventoryRow)
+def format_output(csv_writer, row):
+	output_dict = row.as_dict()
 
 	try:
 		# Readable format to stdout
@@ -426,11 +346,192 @@ def format_output(csv_writer, output_dict):
 		print(f'Error {error} writing [{output_dict}]', file=sys.stderr)
 
 
-# Globals at tenancy level Regions & Compartments
-tenancy_name = ''
-config = {}
-regions = {}
-ADs = {}
+# Split a scan into units of work: region x resource type group x compartment chunk
+def make_work_units(compartment_list, base_compartment_id, filters):
+	units = []
+	scan_types = resources.resource_types if filters['types'] is None else filters['types']
+
+	# Types not in any of the type_groups are searched together
+	groups = [[t for t in group if t in scan_types] for group in type_groups]
+	groups.append([t for t in scan_types if not any(t in group for group in type_groups)])
+	groups = [group for group in groups if len(group) > 0]
+
+	compartment_ids = [c['id'] for c in compartment_list]
+	chunks = [compartment_ids[i:i + compartment_chunk_size] for i in range(0, len(compartment_ids), compartment_chunk_size)]
+
+	for region_name in tenancy.regions:
+		if filters['regions'] is not None and region_name not in filters['regions']:
+			continue
+
+		for group in groups:
+			if any(t in unchunked_types for t in group):
+				units.append({
+					'region': region_name, 'types': group,
+					'compartments': None if base_compartment_id is None else compartment_ids})
+			else:
+				for chunk in chunks:
+					units.append({'region': region_name, 'types': group, 'compartments': chunk})
+
+	return units
+
+
+# Part file of a unit, next to the queue
+def part_path(queue_path, unit_id):
+	part_name = f'{os.path.splitext(os.path.basename(queue_path))[0]}-part-{unit_id}'
+	return os.path.join(os.path.dirname(os.path.abspath(queue_path)), part_name)
+
+
+# Run one unit of work, writing its rows to work_path.csv (moved to the unit's part file when it is completed)
+# Returns the number of rows and the counts and times per resource type
+def run_work_unit(work_path, unit, meta):
+	# Fresh journal for the unit, only used to tell whether the region search completed
+	journal = {'path': work_path + '.journal', 'done': set(), 'pages': {}}
+	open(journal['path'], 'wt').close()
+
+	csv_file = open(work_path + '.csv', 'wt')
+	csv_writer = csv.DictWriter(csv_file, lineterminator='\n', fieldnames=field_names, dialect='excel')
+	written_ocids = set()
+	unit_stats = {}
+
+	filters = dict(meta['filters'], types=unit['types'])
+
+	with trace.span('work unit', region=unit['region'], types=','.join(unit['types'])):
+		list_region_resources(
+			unit['region'], unit['compartments'], filters, journal, csv_file, csv_writer, written_ocids, unit_stats)
+	csv_file.close()
+
+	# Errors are reported (and caught) inside list_region_resources, so check the region was completed
+	if unit['region'] not in journal['done']:
+		raise RuntimeError(f"search of {unit['region']} did not complete")
+
+	return len(written_ocids), unit_stats
+
+
+# Claim and run units of work from the queue until there are none left
+def run_worker(queue_path):
+	global tenancy
+	global storage_metrics
+
+	# The tenancy details were looked up by the coordinator, so only the config profile is needed
+	meta = workqueue.get_meta(queue_path)
+	config = oci.config.from_file(profile_name=profile_name)
+	tenancy = resources.Tenancy(config, meta['tenancy_name'], [], meta['compartment_list'])
+	storage_metrics = meta.get('storage_metrics', False)
+	worker = workqueue.worker_name()
+
+	while True:
+		claimed = workqueue.claim(queue_path, worker)
+		if claimed is None:
+			break
+
+		unit_id, unit = claimed
+		start_time = time.time()
+
+		# Output goes to a file of this worker's own until the unit is completed, so a worker whose lease expired
+		# can't overwrite the part file of the worker that claimed the unit after it
+		unit_path = part_path(queue_path, unit_id)
+		work_path = f"{unit_path}.{worker.replace(':', '-')}"
+		try:
+			rows, unit_stats = run_work_unit(work_path, unit, meta)
+			completed = workqueue.complete(
+				queue_path, unit_id, worker, rows, time.time() - start_time, unit_stats,
+				before_commit=lambda: os.replace(work_path + '.csv', unit_path + '.csv'))
+		except Exception as error:
+			print(f'Error: {error} (unit {unit_id}, worker {worker})', file=sys.stderr)
+			completed = workqueue.fail(queue_path, unit_id, worker, str(error))
+
+		if not completed:
+			print(f'Warning: Unit {unit_id} was claimed by another worker (lease expired), result discarded',
+				file=sys.stderr)
+		for leftover in (work_path + '.csv', work_path + '.journal'):
+			if os.path.exists(leftover):
+				os.remove(leftover)
+
+
+# Split the scan into units of work in the queue, start local workers, wait for all units to be run
+# (by local workers or workers on other hosts started with --worker) and merge the output into the usual CSV
+# Units are split and ordered (largest first) using the stats of earlier runs, see ocicloud/schedule.py
+def run_coordinator(queue_path, compartment_list, base_compartment_id, filters, worker_count, resume):
+	if resume and os.path.isfile(queue_path):
+		released = workqueue.retry_failed(queue_path)
+		if released > 0:
+			print(f'{released} units claimed by stopped workers put back in the queue')
+	else:
+		meta = {
+			'profile_name': profile_name, 'tenancy_name': tenancy.name,
+			'compartment_list': compartment_list, 'filters': filters, 'storage_metrics': storage_metrics}
+		units = schedule.plan_units(
+			make_work_units(compartment_list, base_compartment_id, filters), schedule.load_stats(stats_path()),
+			len(compartment_list), unchunked_types)
+		workqueue.create(queue_path, meta, units)
+
+	# Local workers (their row output is not needed, only the part files)
+	worker_command = [sys.executable, os.path.abspath(__file__), profile_name, '--worker', queue_path]
+	workers = [subprocess.Popen(worker_command, stdout=subprocess.DEVNULL) for _ in range(worker_count)]
+
+	with trace.span('wait for workers', workers=worker_count):
+		while True:
+			# Checked before the queue, so a worker that completes the last unit and stops in between isn't an error
+			workers_stopped = worker_count > 0 and all(w.poll() is not None for w in workers)
+
+			queue_status = workqueue.status(queue_path)
+			debug_out(f'Work units: {queue_status}')
+			if queue_status[workqueue.PENDING] == 0 and queue_status[workqueue.CLAIMED] == 0:
+				break
+			if workers_stopped:
+				print('Error: All workers have stopped with work outstanding', file=sys.stderr)
+				break
+			time.sleep(2)
+
+	for worker in workers:
+		worker.wait()
+
+	with trace.span('merge'):
+		merge_work_units(queue_path)
+
+	if records_stats(base_compartment_id, filters):
+		save_work_unit_stats(queue_path)
+
+
+# Merge the part files of all completed units into the CSV output file (each OCID once)
+def merge_work_units(queue_path):
+	csv_file, csv_writer, written_ocids = csv_open(f"oci-{profile_name}")
+
+	for unit_id, unit, unit_status, rows, seconds, error, _ in workqueue.units(queue_path):
+		if unit_status != workqueue.DONE:
+			print(f"Error: Unit {unit_id} {unit['region']} {','.join(unit['types'])} {unit_status}: {error}",
+				file=sys.stderr)
+			continue
+
+		with open(part_path(queue_path, unit_id) + '.csv', 'rt', newline='') as part_file:
+			for row in csv.DictReader(part_file, fieldnames=field_names):
+				if row['OCID'] not in written_ocids:
+					written_ocids.add(row['OCID'])
+					csv_writer.writerow(row)
+
+	csv_file.close()
+	print(f'{len(written_ocids)} resources written to {output_dir}/oci-{profile_name}.csv')
+
+
+# Save the stats of the completed units, for region and types with no incomplete units (i.e. complete counts)
+def save_work_unit_stats(queue_path):
+	run_stats = {}
+	incomplete = set()
+
+	for unit_id, unit, unit_status, rows, seconds, error, unit_stats in workqueue.units(queue_path):
+		if unit_status == workqueue.DONE and unit_stats is not None:
+			schedule.merge_stats(run_stats, unit_stats)
+		else:
+			incomplete.update((unit['region'], t) for t in unit['types'])
+
+	for region_name, resource_type in incomplete:
+		run_stats.get(region_name, {}).pop(resource_type, None)
+
+	schedule.save_stats(stats_path(), run_stats)
+
+
+# Tenancy being listed (config, name, regions & compartments, see ocicloud/resources.py)
+tenancy = None
 
 # Execute only if run as a script
 if __name__ == '__main__':
@@ -444,18 +545,65 @@ if __name__ == '__main__':
 	parser.add_argument('-c', '--compartment-id', dest='compartment_id', action='store',
 	                    metavar='<compartment id>',
 	                    help='Compartment OCID', required=False)
+	parser.add_argument('--resume', action='store_true',
+						help='Continue an interrupted scan from the last checkpoint')
+	parser.add_argument('--summary', action='store_true',
+						help='Only print totals per compartment, region and type')
+	parser.add_argument('--storage-metrics', action='store_true',
+						help='Size buckets and file systems from Monitoring metrics (fewer, faster requests)')
+	trace.add_arguments(parser)
+
+	# Filters
+	parser.add_argument('--type', dest='types', action='append', metavar='<type>',
+						help='Only list this resource type (e.g. instance)')
+	parser.add_argument('--region', dest='regions', action='append', metavar='<region>',
+						help='Only search this region (e.g. eu-frankfurt-1)')
+	parser.add_argument('--state', dest='states', action='append', metavar='<state>',
+						help='Only list resources in this lifecycle state (e.g. RUNNING)')
+	parser.add_argument('--tag', dest='tags', action='append', metavar='<namespace.key[=value]>',
+						help='Only list resources with this defined tag (and value, if given)')
+	parser.add_argument('--created-by', dest='creators', action='append', metavar='<user>',
+						help='Only list resources created by this user (Owner.Creator tag)')
+
+	# Sharded execution
+	parser.add_argument('--coordinator', metavar='<queue file>',
+						help='Split the scan into units of work in this queue file and merge the results')
+	parser.add_argument('--workers', type=int, default=0, metavar='<n>',
+						help='Number of local worker processes started by the coordinator')
+	parser.add_argument('--worker', metavar='<queue file>', help='Run units of work from this queue file')
 
 	args = parser.parse_args()
+	trace.start(args)
 
 	profile_name = args.profile_name
 	compartment_id = args.compartment_id
+	storage_metrics = args.storage_metrics
+
+	filters = {
+		'types': None if args.types is None else [t.lower() for t in args.types],
+		'regions': args.regions,
+		'states': args.states,
+		'tags': args.tags,
+		'creators': args.creators
+	}
+
+	if args.worker is not None:
+		# Everything needed is in the queue
+		run_worker(args.worker)
+		sys.exit(0)
 
 	# Get list of compartments
-	compartment_list = get_compartment_list(profile_name, compartment_id)
+	tenancy = resources.open_tenancy(profile_name, compartment_id)
+	compartment_list = tenancy.compartment_list
 
 	start = time.time()
-	# List all the resources in each compartment
-	list_tenancy_resources(compartment_list, compartment_id)
+	if args.summary:
+		summarise_tenancy_resources(compartment_list, compartment_id, filters)
+	elif args.coordinator is not None:
+		run_coordinator(args.coordinator, compartment_list, compartment_id, filters, args.workers, args.resume)
+	else:
+		# List all the resources in each compartment
+		list_tenancy_resources(compartment_list, compartment_id, args.resume, filters)
 
 	if debug:
 		print(f'TIME TAKEN: {(time.time() - start):6.2f}')
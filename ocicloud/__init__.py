@@ -0,0 +1,12 @@
+# ocicloud
+#
+# Shared code for the Oracle Cloud scripts in this repository
+#
+# The work the scripts do can also be called from other Python code (lazy generators of records, no global state):
+#	resources.iter_resources(tenancy, ...)				OCI resources (InventoryRow), see resources.open_tenancy
+#	metering.iter_usage_costs(tenancy, start, end, ...)	usage cost lines (UsageCost)
+#	metering.get_balances(tenancies)					account balances (Balance)
+#	psm.iter_psm_services(tenancy)						PSM service instances (PsmService)
+#	pricing.get_price_catalogue(currencies)				price bands of every SKU in several currencies
+#	priceindex.PriceIndex(path)							SKU price lookups from the index written by oci-prices.py
+#
@@ -0,0 +1,81 @@
+# ocicloud/capabilities.py
+#
+# Resource types each region's search service accepts
+#
+# A search query naming a type the region doesn't have (e.g. oceinstance in some regions) fails as a whole, so
+# the types searched in a region are checked first. A probe is a search for a list of types (limit 1 result): if
+# it fails, the list is bisected and each half probed, down to the types the region rejects, so a region with one
+# unsupported type costs about 2 log2(n) probes rather than one per type. The results are kept in a cache file
+# and each type is only probed again once its entry is older than cache_ttl.
+#
+# Cache: {region: {type: {'supported': true/false, 'time': seconds since the epoch}}}
+#
+# 19-oct-2026	Martin Bridge	Created
+# 19-oct-2026	Martin Bridge	Cache file read and written with ocicloud/jsonfile.py
+
+import time
+
+import oci
+
+from ocicloud import jsonfile, trace
+
+cache_file = './log/oci-capabilities.json'
+cache_ttl = 7 * 24 * 60 * 60            # Seconds before a cached type is probed again
+
+
+# No cache yet, or unreadable, means probe everything
+def cache_load():
+	return jsonfile.load(cache_file)
+
+
+# Save the entries for one region, keeping the others (which another process may have updated meanwhile)
+# The cache only saves probes, so a scan carries on if it can't be written (e.g. no ./log directory)
+def cache_save(region_name, region_cache):
+	cache = cache_load()
+	cache[region_name] = region_cache
+	jsonfile.save(cache_file, cache)
+
+
+# True if the region accepts a search for all of the types, False if it rejects the query (other errors raised)
+def probe(search_client, region_types):
+	search_spec = oci.resource_search.models.StructuredSearchDetails()
+	search_spec.query = f"query {', '.join(region_types)} resources"
+
+	with trace.span('capability probe', types=len(region_types)):
+		try:
+			search_client.search_resources(search_details=search_spec, limit=1)
+		except oci.exceptions.ServiceError as error:
+			if error.status != 400:
+				raise
+			return False
+	return True
+
+
+# Types the region rejects, by bisecting the list until each failing probe is down to a single type
+def find_unsupported(search_client, region_types):
+	if probe(search_client, region_types):
+		return []
+	if len(region_types) == 1:
+		return list(region_types)
+
+	middle = len(region_types) // 2
+	return find_unsupported(search_client, region_types[:middle]) + find_unsupported(search_client, region_types[middle:])
+
+
+# The types (of region_types, in the same order) the region supports, probing any not in the cache or out of date
+# refresh probes all of them again (e.g. after a search the cache said was fine has failed)
+def supported_types(search_client, region_name, region_types, refresh=False):
+	region_cache = cache_load().get(region_name, {})
+	now = time.time()
+
+	unknown = [
+		t for t in region_types
+		if refresh or t not in region_cache or now - region_cache[t]['time'] >= cache_ttl]
+
+	if len(unknown) > 0:
+		unsupported = find_unsupported(search_client, unknown)
+		for t in unknown:
+			region_cache[t] = {'supported': t not in unsupported, 'time': now}
+		cache_save(region_name, region_cache)
+
+	return [t for t in region_types if region_cache[t]['supported']]
@@ -0,0 +1,71 @@
+# ocicloud/client.py
+#
+# Shared HTTP client for the REST based scripts (metering, PSM and price list APIs)
+#
+# One keep-alive session (connection pool) per host, so repeated calls to the same API reuse the TCP/TLS
+# connection instead of a new handshake per request. All requests get the same timeouts, retries on
+# transient errors, gzip compression and, when given, the IDCS tenant header.
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ======================================================================================================================
+connect_timeout = 10        # Seconds to establish a connection
+read_timeout = 120          # Seconds to wait for a response (metering calls can override this)
+retries = 3                 # Retries on connection errors and 429/5xx responses
+pool_size = 16              # Connections kept open per host (enough for the threaded scripts)
+# ======================================================================================================================
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+# Keep-alive session for the host of the given URL, created on first use
+def get_session(url):
+	host = urlparse(url).netloc
+
+	with _sessions_lock:
+		session = _sessions.get(host)
+		if session is None:
+			retry = Retry(
+				total=retries, backoff_factor=0.5,
+				status_forcelist=(429, 500, 502, 503, 504), allowed_methods=['GET'],
+				raise_on_status=False)  # Return the last response so callers can report the error as usual
+			adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+			session = requests.Session()
+			session.mount('https://', adapter)
+			session.mount('http://', adapter)
+			session.headers['Accept-Encoding'] = 'gzip'
+			_sessions[host] = session
+
+	return session
+
+
+# GET a URL using the pooled session for its host
+# auth is a (username, password) tuple, idcs_guid is sent as the X-ID-TENANT-NAME header
+def get(url, params=None, headers=None, auth=None, idcs_guid=None, timeout=None):
+	request_headers = {} if headers is None else dict(headers)
+	if idcs_guid is not None:
+		request_headers['X-ID-TENANT-NAME'] = idcs_guid
+
+	return get_session(url).get(
+		url,
+		params=params,
+		headers=request_headers,
+		auth=auth,
+		timeout=(connect_timeout, read_timeout if timeout is None else timeout))
+
+
+# Close all pooled connections
+def close():
+	with _sessions_lock:
+		for session in _sessions.values():
+			session.close()
+		_sessions.clear()
@@ -0,0 +1,122 @@
+# ocicloud/diff.py
+#
+# Differences between two inventory snapshots (CSV files written by oci-resources.py), matched by OCID
+#
+# Two ways to match the snapshots, both linear in the size of the snapshots:
+#	hash_diff	the old snapshot is held in a dictionary (OCID -> InventoryRow) and the new one streamed past it
+#	merge_diff	both snapshots are sorted by OCID (external sort, in runs of run_size rows spilled to temporary
+#				files) then merged, so memory is bounded by run_size however big the snapshots are
+# diff_snapshots picks hash_diff when the old snapshot is small enough to hold in memory
+#
+# Each difference is (change, old row, new row, deltas), where change is ADDED, REMOVED or CHANGED and deltas is
+# a list of (field, old value, new value) for the diff_fields that changed
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import csv
+import heapq
+import os
+import tempfile
+from itertools import islice
+
+from ocicloud.inventory import InventoryRow, read_csv
+
+ADDED = 'ADDED'
+REMOVED = 'REMOVED'
+CHANGED = 'CHANGED'
+
+# Fields compared between snapshots (CSV heading -> InventoryRow attribute)
+diff_fields = {'State': 'state', 'OCPU': 'ocpu', 'GBytes': 'gbytes', 'BYOLstatus': 'byol_status'}
+
+run_size = 200000               # Rows per sorted run in the external sort
+hash_limit_bytes = 100000000    # Use hash_diff when the old snapshot file is smaller than this
+
+
+# Changed fields between two rows for the same resource
+def row_deltas(old_row, new_row):
+	deltas = []
+	for field, attr in diff_fields.items():
+		old_value = getattr(old_row, attr)
+		new_value = getattr(new_row, attr)
+		if attr == 'gbytes':
+			# Sizes are output to 3 decimal places, ignore any difference smaller than that
+			changed = round(old_value, 3) != round(new_value, 3)
+		else:
+			changed = old_value != new_value
+		if changed:
+			deltas.append((field, old_value, new_value))
+	return deltas
+
+
+def hash_diff(old_path, new_path):
+	old_rows = {row.ocid: row for row in read_csv(old_path)}
+
+	for new_row in read_csv(new_path):
+		old_row = old_rows.pop(new_row.ocid, None)
+		if old_row is None:
+			yield ADDED, None, new_row, []
+		else:
+			deltas = row_deltas(old_row, new_row)
+			if len(deltas) > 0:
+				yield CHANGED, old_row, new_row, deltas
+
+	# Anything left was not in the new snapshot
+	for old_row in old_rows.values():
+		yield REMOVED, old_row, None, []
+
+
+# Rows of an inventory CSV in OCID order, sorted in runs of run_size rows which are merged
+def sorted_rows(path, temp_dir, run_prefix):
+	rows = read_csv(path)
+	run_paths = []
+
+	while True:
+		run = sorted(islice(rows, run_size), key=lambda r: r.ocid)
+		if len(run) == 0:
+			break
+
+		run_path = os.path.join(temp_dir, f'{run_prefix}-{len(run_paths)}.csv')
+		with open(run_path, 'wt', newline='') as run_file:
+			csv.writer(run_file).writerows(r.values() for r in run)
+		run_paths.append(run_path)
+
+	def read_run(run_path):
+		with open(run_path, 'rt', newline='') as run_file:
+			for record in csv.reader(run_file):
+				yield InventoryRow.from_csv(record)
+
+	return heapq.merge(*(read_run(p) for p in run_paths), key=lambda r: r.ocid)
+
+
+def merge_diff(old_path, new_path):
+	with tempfile.TemporaryDirectory(prefix='oci-diff-') as temp_dir:
+		old_rows = sorted_rows(old_path, temp_dir, 'old')
+		new_rows = sorted_rows(new_path, temp_dir, 'new')
+
+		old_row = next(old_rows, None)
+		new_row = next(new_rows, None)
+
+		while old_row is not None or new_row is not None:
+			if new_row is None or (old_row is not None and old_row.ocid < new_row.ocid):
+				yield REMOVED, old_row, None, []
+				old_row = next(old_rows, None)
+			elif old_row is None or new_row.ocid < old_row.ocid:
+				yield ADDED, None, new_row, []
+				new_row = next(new_rows, None)
+			else:
+				deltas = row_deltas(old_row, new_row)
+				if len(deltas) > 0:
+					yield CHANGED, old_row, new_row, deltas
+				old_row = next(old_rows, None)
+				new_row = next(new_rows, None)
+
+
+# Differences between two snapshots, method is 'hash', 'merge' or None to choose by snapshot size
+def diff_snapshots(old_path, new_path, method=None):
+	if method is None:
+		method = 'hash' if os.path.getsize(old_path) < hash_limit_bytes else 'merge'
+
+	if method == 'hash':
+		return hash_diff(old_path, new_path)
+	else:
+		return merge_diff(old_path, new_path)
@@ -0,0 +1,76 @@
+# ocicloud/inventory.py
+#
+# Compact in-memory representation of resource inventory rows (as listed by oci-resources.py)
+#
+# Each row is an InventoryRow (__slots__, no per-row dictionary) and the values repeated across many rows
+# (tenancy, region, compartment path, type, state, shape etc.) are interned, so every row shares one copy.
+# A row, including its unique strings (name, created, OCID), takes less than half the memory of the equivalent
+# dictionary: around 440 bytes compared with 950 at both 100k and 1M rows. See bench/inventory_memory.py
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import csv
+import sys
+
+# CSV column headings, in output order
+field_names = ['Tenancy', 'Region', 'Compartment', 'Type', 'Name', 'State', 'DB',
+				'Shape', 'OCPU', 'GBytes', 'BYOLstatus', 'VolAttached', 'Created', 'CreatedBy', 'OCID']
+
+
+# Values that repeat across rows (tenancy, region, compartment etc.) are interned so rows share one copy
+# (some SDK attributes can be None, so only strings are interned)
+def _intern(value):
+	return sys.intern(value) if type(value) is str else value
+
+
+class InventoryRow:
+	__slots__ = ('tenancy', 'region', 'compartment', 'type', 'name', 'state', 'db',
+				'shape', 'ocpu', 'gbytes', 'byol_status', 'vol_attached', 'created', 'created_by', 'ocid')
+
+	def __init__(self, tenancy, region, compartment, type, name, state, db,
+				shape, ocpu, gbytes, byol_status, vol_attached, created, created_by, ocid):
+		self.tenancy = _intern(tenancy)
+		self.region = _intern(region)
+		self.compartment = _intern(compartment)
+		self.type = _intern(type)
+		self.name = name
+		self.state = _intern(state)
+		self.db = _intern(db)
+		self.shape = _intern(shape)
+		self.ocpu = ocpu
+		self.gbytes = gbytes
+		self.byol_status = _intern(byol_status)
+		self.vol_attached = _intern(vol_attached)
+		self.created = created
+		self.created_by = _intern(created_by)
+		self.ocid = ocid
+
+	# Column values in field_names order
+	def values(self):
+		return (
+			self.tenancy, self.region, self.compartment, self.type, self.name, self.state, self.db,
+			self.shape, self.ocpu, self.gbytes, self.byol_status, self.vol_attached, self.created,
+			self.created_by, self.ocid)
+
+	# Dictionary keyed by field_names (for csv.DictWriter and print formats)
+	def as_dict(self):
+		return dict(zip(field_names, self.values()))
+
+	# Row from a CSV record (list of strings in field_names order)
+	@classmethod
+	def from_csv(cls, record):
+		values = list(record)
+		values[8] = int(values[8] or 0)             # OCPU
+		values[9] = float(values[9] or 0.0)         # GBytes
+		return cls(*values)
+
+
+# Rows from an inventory CSV file (as written by oci-resources.py), columns matched by heading
+def read_csv(path):
+	with open(path, 'rt', newline='') as csv_file:
+		reader = csv.reader(csv_file)
+		header = next(reader)
+		columns = [header.index(f) for f in field_names]
+
+		for record in reader:
+			yield InventoryRow.from_csv(record[c] for c in columns)
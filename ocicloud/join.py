@@ -0,0 +1,185 @@
+# ocicloud/join.py
+#
+# Join usage cost line items to inventory rows (oci-resources.py CSV)
+#
+# The inventory is loaded into hash indexes (OCID, service type + name, name), then the usage file is streamed
+# through once, so memory depends on the number of resources, not the number of usage rows.
+#
+# Usage rows are matched:
+#   1. by resource identifier, when the usage row carries an OCID (ResourceId column, or an OCID as ResourceName)
+#   2. by service + resource name, using service_types to map usage service names to inventory resource types
+#   3. by resource name alone, if that name is unique in the inventory
+# Anything else is reported against unallocated_key.
+#
+# Only usage files that identify resources can be allocated this way. The OCI Cost and Usage Reports do
+# (product/resourceId, with the cost in cost/myCost), and are read as they are. usage_cost_total.py --detail
+# output does not: the metering API aggregates usage per SKU, and its ResourceName is the SKU name (e.g.
+# PIC_COMPUTE_STANDARD_E4_OCPU), so almost all of its rows end up unallocated (see has_resource_ids).
+#
+# 19-oct-2026	Martin Bridge	Created
+# 19-oct-2026	Martin Bridge	Read OCI Cost and Usage Reports; note that metering detail has no resource ids
+
+import csv
+import re
+import sys
+
+unallocated_key = '(unallocated)'
+
+# Usage service names (normalised, see name_key) to inventory resource types
+service_types = {
+	'compute': ('Instance', 'Image'),
+	'blockstorage': ('Volume', 'BootVolume', 'VolumeGroup', 'VolumeBackup', 'BootVolumeBackup', 'VolumeGroupBackup'),
+	'objectstorage': ('Bucket',),
+	'filestorage': ('FileSystem', 'MountTarget'),
+	'database': ('DbSystem', 'Database'),
+	'adwc': ('AutonomousDatabase',),
+	'atp': ('AutonomousDatabase',),
+	'autonomousdatabase': ('AutonomousDatabase', 'AutonomousContainerDatabase'),
+	'analytics': ('AnalyticsInstance',),
+	'integration': ('IntegrationInstance',),
+	'integrationcloud': ('IntegrationInstance',),
+	'loadbalancer': ('LoadBalancer',),
+	'functions': ('FunctionsApplication', 'FunctionsFunction'),
+	'datascience': ('DataScienceModel', 'DataScienceNotebookSession', 'DataScienceProject'),
+	'apigateway': ('ApiGateway', 'ApiDeployment'),
+	'contentandexperience': ('OceInstance',),
+	'vault': ('Vault', 'VaultSecret'),
+}
+
+# Columns of the usage file: (service, resource name, resource id, default cost), metering detail CSV first
+usage_columns = [
+	('ServiceName', 'ResourceName', 'ResourceId', 'CalcLineCost'),
+	('product/service', 'product/resourceId', 'product/resourceId', 'cost/myCost'),
+]
+
+_non_alnum = re.compile('[^a-z0-9]')
+
+# Marks a name that belongs to more than one resource, so cannot be used for a match
+_ambiguous = object()
+
+
+# Names are compared ignoring case and punctuation (e.g. "ADW_Prod" matches "adw-prod")
+def name_key(name):
+	return _non_alnum.sub('', name.lower())
+
+
+class ResourceIndex:
+	__slots__ = ('by_ocid', 'by_type_name', 'by_name', 'resource_count', '_strings')
+
+	def __init__(self):
+		self.by_ocid = {}           # OCID -> (compartment, created by)
+		self.by_type_name = {}      # (resource type, name key) -> (compartment, created by)
+		self.by_name = {}           # name key -> (compartment, created by)
+		self.resource_count = 0
+		self._strings = {}          # Shared (compartment, created by) tuples, as there are few distinct ones
+
+	def add(self, resource_type, name, compartment, created_by, ocid):
+		owner = self._strings.setdefault((compartment, created_by), (compartment, created_by))
+		self.resource_count += 1
+
+		if ocid:
+			self.by_ocid[ocid] = owner
+
+		key = name_key(name)
+		if key == '':
+			return
+
+		for index, index_key in ((self.by_type_name, (resource_type, key)), (self.by_name, key)):
+			existing = index.get(index_key)
+			if existing is None:
+				index[index_key] = owner
+			elif existing is not owner:
+				index[index_key] = _ambiguous
+
+	# Load an inventory CSV (as written by oci-resources.py)
+	def load_csv(self, path):
+		with open(path, 'rt', newline='') as csv_file:
+			for row in csv.DictReader(csv_file):
+				self.add(row['Type'], row['Name'], row['Compartment'], row['CreatedBy'], row['OCID'])
+
+	# (compartment, created by) for a usage line item, or None if no match
+	def match(self, service_name, resource_name, resource_id=''):
+		# 1. Resource identifier
+		for ocid in (resource_id, resource_name):
+			if ocid.startswith('ocid1.'):
+				owner = self.by_ocid.get(ocid)
+				if owner is not None:
+					return owner
+
+		key = name_key(resource_name)
+
+		# 2. Service and name
+		for resource_type in service_types.get(name_key(service_name), ()):
+			owner = self.by_type_name.get((resource_type, key))
+			if owner is not None:
+				return None if owner is _ambiguous else owner
+
+		# 3. Name only
+		owner = self.by_name.get(key)
+		return None if owner is _ambiguous else owner
+
+
+# Columns (service, name, id, default cost) of the usage file format a header is in
+def usage_format(header):
+	for columns in usage_columns:
+		service, name = columns[:2]
+		if service in header and name in header:
+			return columns
+
+	raise ValueError(f'Not a usage cost file, no {" or ".join(c[0] for c in usage_columns)} column')
+
+
+# Column positions (service, name, id, cost) in a usage file header, id is None if there is no resource id column
+# cost_column None uses the default cost column of the format
+def find_usage_columns(header, cost_column=None):
+	service, name, resource_id, default_cost = usage_format(header)
+	cost = default_cost if cost_column is None else cost_column
+	if cost not in header:
+		raise ValueError(f"No '{cost}' column in the usage file")
+
+	return (
+		header.index(service), header.index(name), header.index(resource_id) if resource_id in header else None,
+		header.index(cost))
+
+
+# True if rows of the usage file can be matched to resources by id (False for usage_cost_total.py --detail output)
+def has_resource_ids(usage_path):
+	with open(usage_path, 'rt', newline='') as csv_file:
+		header = next(csv.reader(csv_file))
+	return usage_format(header)[2] in header
+
+
+# Stream a usage cost CSV and total the cost column per compartment and per creator
+# Returns (cost by compartment, cost by creator, matched row count, unmatched row count)
+def join_usage_csv(index, usage_path, cost_column=None):
+	compartment_cost = {}
+	creator_cost = {}
+	matched = 0
+	unmatched = 0
+
+	with open(usage_path, 'rt', newline='') as csv_file:
+		reader = csv.reader(csv_file)
+		header = next(reader)
+		service_col, name_col, id_col, cost_col = find_usage_columns(header, cost_column)
+
+		for row in reader:
+			if len(row) != len(header):
+				print(f'Skipping malformed usage row: {row}', file=sys.stderr)
+				continue
+
+			cost = float(row[cost_col] or 0.0)
+			owner = index.match(row[service_col], row[name_col], '' if id_col is None else row[id_col])
+
+			if owner is None:
+				unmatched += 1
+				compartment, created_by = unallocated_key, unallocated_key
+			else:
+				matched += 1
+				compartment, created_by = owner
+				if created_by == '':
+					created_by = unallocated_key
+
+			compartment_cost[compartment] = compartment_cost.get(compartment, 0.0) + cost
+			creator_cost[created_by] = creator_cost.get(created_by, 0.0) + cost
+
+	return compartment_cost, creator_cost, matched, unmatched
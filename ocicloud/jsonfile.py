@@ -0,0 +1,38 @@
+# ocicloud/jsonfile.py
+#
+# Small JSON files the scripts keep between runs (capability cache, PSM cache, scan statistics)
+#
+# These only save work on later runs, so a missing or unreadable file loads as empty, and a file that can't be
+# written (e.g. no ./log directory) is not an error. Each process writes its own temporary file and renames it
+# into place, so an interrupted run, or another process saving at the same time, never leaves a corrupt file.
+#
+# 19-oct-2026	Martin Bridge	Created (from the cache code in capabilities.py, psm.py and schedule.py)
+
+import json
+import os
+
+
+# Contents of the file ({} if there is no file yet, or it can't be read)
+def load(path):
+	try:
+		with open(os.path.expanduser(path), 'rt') as f:
+			return json.load(f)
+	except (OSError, ValueError):
+		return {}
+
+
+# Replace the file's contents, True if it was written
+def save(path, data):
+	path = os.path.expanduser(path)
+	tmp_path = f'{path}.{os.getpid()}.tmp'
+	try:
+		with open(tmp_path, 'wt') as f:
+			json.dump(data, f, indent=1, sort_keys=True)
+		os.replace(tmp_path, path)
+	except OSError:
+		try:
+			os.remove(tmp_path)
+		except OSError:
+			pass
+		return False
+	return True
@@ -0,0 +1,230 @@
+# ocicloud/metering.py
+#
+# Account balances and usage costs from the Oracle Cloud Account Metering API (the calls behind get_balance.py
+# and usage_cost_total.py), usable from other Python code
+#
+#	for balance in get_balances(['mytenant']):
+#		print(balance.tenancy, balance.balance)
+#	for cost in iter_usage_costs('mytenant', datetime(2021, 6, 1), datetime(2021, 7, 1)):
+#		print(cost.sku, cost.list_line_cost)
+#
+# Credentials for each tenancy (username, password, domain, idcs_guid) are read from the config file, or can be
+# passed in as an account dictionary. Records are produced lazily and nothing is printed; a request that fails
+# raises MeteringError.
+#
+# 19-oct-2026	Martin Bridge	Created (from get_balance.py and usage_cost_total.py)
+# 19-oct-2026	Martin Bridge	List price bands apply per billing month of each line item
+
+import configparser
+import json
+import os
+
+from ocicloud import client, pricing, trace
+
+configfile = '~/.oci/config.ini'
+metering_url = 'https://itra.oraclecloud.com/metering/api/v1'
+
+# Usage cost dictionary keys and headings (see UsageCost.as_dict)
+usage_field_names = [
+	'Tenancy', 'ServiceName', 'ResourceName', 'SKU', 'Qty',
+	'UnitPrc', 'Total', 'Cur', 'OvrFlg', 'ComputeType',
+	'CalcUnitPrc', 'CalcLineCost', 'ListUnitPrc', 'ListLineCost']
+
+
+class MeteringError(Exception):
+
+	def __init__(self, tenancy_name, status_code, reason, message):
+		super().__init__(f'{status_code} ({reason}) on tenancy {tenancy_name}: {message}')
+		self.tenancy_name = tenancy_name
+		self.status_code = status_code
+		self.reason = reason
+		self.message = message
+
+
+class Balance:
+	__slots__ = ('tenancy', 'currency', 'purchased', 'balance', 'consumed')
+
+	def __init__(self, tenancy, currency, purchased, balance, consumed):
+		self.tenancy = tenancy
+		self.currency = currency
+		self.purchased = purchased
+		self.balance = balance
+		self.consumed = consumed
+
+
+# One usage cost line (an item can have several, e.g. normal and overage costs)
+# calc_unit_price corrects the overage unit price (see iter_usage_costs), list prices are from the price list
+class UsageCost:
+	__slots__ = (
+		'tenancy', 'service_name', 'resource_name', 'sku', 'quantity', 'unit_price', 'amount', 'currency',
+		'overages_flag', 'compute_type', 'calc_unit_price', 'calc_line_cost', 'list_unit_price', 'list_line_cost')
+
+	def __init__(
+			self, tenancy, service_name, resource_name, sku, quantity, unit_price, amount, currency,
+			overages_flag, compute_type, calc_unit_price, calc_line_cost, list_unit_price, list_line_cost):
+		self.tenancy = tenancy
+		self.service_name = service_name
+		self.resource_name = resource_name
+		self.sku = sku
+		self.quantity = quantity
+		self.unit_price = unit_price
+		self.amount = amount
+		self.currency = currency
+		self.overages_flag = overages_flag
+		self.compute_type = compute_type
+		self.calc_unit_price = calc_unit_price
+		self.calc_line_cost = calc_line_cost
+		self.list_unit_price = list_unit_price
+		self.list_line_cost = list_line_cost
+
+	# Only 'Usage' costs are billed ('Do Not Bill' costs are not)
+	def is_billed(self):
+		return self.compute_type == 'Usage'
+
+	# Dictionary keyed by usage_field_names (for csv.DictWriter and print formats)
+	def as_dict(self):
+		return dict(zip(usage_field_names, (
+			self.tenancy, self.service_name, self.resource_name, self.sku, self.quantity, self.unit_price,
+			self.amount, self.currency, self.overages_flag, self.compute_type, self.calc_unit_price,
+			self.calc_line_cost, self.list_unit_price, self.list_line_cost)))
+
+
+# All tenancies in the config file (configparser, one section per tenancy)
+def load_accounts(path=None):
+	# Just in case we use the tilde (~) home directory character
+	config_path = os.path.expanduser(configfile if path is None else path)
+
+	if not os.path.isfile(config_path):
+		raise FileNotFoundError(f'Config file not found ({config_path})')
+
+	with trace.span('config load'):
+		config = configparser.ConfigParser()
+		config.read(config_path)
+
+	return config
+
+
+# Credentials of one tenancy from the config file
+def get_account(tenancy_name, path=None):
+	return load_accounts(path)[tenancy_name]
+
+
+# GET from the metering API, raising MeteringError if it fails
+def metering_get(tenancy_name, account, path, params=None, timeout=None):
+	resp = client.get(
+		metering_url + path + account['domain'],
+		auth=(account['username'], account['password']),
+		idcs_guid=account['idcs_guid'],
+		params=params,
+		timeout=timeout
+	)
+
+	if resp.status_code != 200:
+		# This means something went wrong
+		raise MeteringError(tenancy_name, resp.status_code, resp.reason, json.loads(resp.text)['errorMessage'])
+
+	return resp
+
+
+# Account balances of the given tenancies (default: all in the config file, or in accounts if given)
+# Note: Assumes there is only one purchase to create the tenancy (multiple purchase entries may do strange things!)
+def get_balances(tenancy_names=None, accounts=None):
+	if accounts is None:
+		accounts = load_accounts()
+
+	if tenancy_names is None:
+		tenancy_names = [name for name in accounts if name != configparser.DEFAULTSECT]
+
+	for tenancy_name in tenancy_names:
+		with trace.span('balance fetch', tenancy=tenancy_name):
+			resp = metering_get(tenancy_name, accounts[tenancy_name], '/cloudbucks/')
+
+		for item in resp.json()['items']:
+			purchased = item['purchase'][0]['purchasedResources'][0]
+			balance = item['balance'][0]['purchasedResources'][0]
+
+			# Calculate amt consumed so far
+			yield Balance(tenancy_name, purchased['unit'], purchased['value'], balance['value'],
+				purchased['value'] - balance['value'])
+
+
+# Usage cost lines of a tenancy between start_time and end_time (datetimes, end not inclusive)
+# granularity is TOTAL, HOURLY or DAILY; the list price is in GBP (monthly commit) unless a price list is given
+# Price bands (e.g. free tiers) are applied per month, except with TOTAL over more than a month, when the usage
+# isn't split by month and a free tier is only counted once (see ocicloud/pricing.py)
+def iter_usage_costs(tenancy_name, start_time, end_time, granularity='TOTAL', account=None, price_list=None):
+	if account is None:
+		account = get_account(tenancy_name)
+
+	if price_list is None:
+		with trace.span('price list fetch'):
+			price_list = pricing.get_price_list("GBP", pricing.MONTHLY)
+
+	# Oracle API needs the milliseconds explicitly
+	url_params = {
+		'startTime': start_time.isoformat() + '.000',
+		'endTime': end_time.isoformat() + '.000',
+		'usageType': granularity,
+		'dcAggEnabled': 'N',
+		'computeTypeEnabled': 'Y'
+	}
+
+	with trace.span('metering fetch', tenancy=tenancy_name):
+		resp = metering_get(tenancy_name, account, '/usagecost/', params=url_params, timeout=600)
+
+	with trace.span('parse'):
+		items = resp.json()
+
+	# List cost depends on how much of each SKU has been used so far in the billing month (price bands), so work
+	# out the list cost of every line item in one pass before totalling
+	with trace.span('list price', items=len(items['items'])):
+		part_numbers = [item['gsiProductId'] for item in items['items'] for cost in item['costs']]
+		quantities = [cost['computedQuantity'] for item in items['items'] for cost in item['costs']]
+		months = [item.get('startTimeUtc', '')[:7] for item in items['items'] for cost in item['costs']]
+		list_line_costs = pricing.list_line_costs(price_list, part_numbers, quantities, months)
+	line_num = 0
+
+	for item in items['items']:
+		# Each service could have multiple costs (e.g. in overage)
+		# Because of an anomoly in billing, overage amounts use the wrong unitPrice
+		# so take the unit price from the non-overage entry
+
+		costs = item['costs']
+		calc_unit_price = 0
+		std_unit_price = 0
+
+		# TESTING
+		# Find the pricing record for the non-overage amount
+		# This only works if there are records for overage and non-overage in the same report range!!
+		# This code is pretty ugly, but it's a quick (temporary!) test
+		for cost in costs:
+			if cost['overagesFlag'] == "N":
+				std_unit_price = cost['unitPrice']
+
+		for cost in costs:
+
+			if std_unit_price == 0:
+				# Std price not found for non-overage, so just use the (probabl) overages one
+				calc_unit_price = cost['unitPrice']
+			else:
+				calc_unit_price = std_unit_price
+
+			calc_line_item_cost = calc_unit_price * cost['computedQuantity']
+
+			# Get list price of current item
+			partNum = item['gsiProductId']
+			list_line_cost = list_line_costs[line_num]
+			line_num += 1
+
+			# Effective unit price (only differs from the list unit price when the line crosses price bands)
+			if cost['computedQuantity'] != 0:
+				list_unit_price = list_line_cost / cost['computedQuantity']
+			elif partNum in price_list:
+				list_unit_price = price_list[partNum].unit_price()
+			else:
+				list_unit_price = 0.0
+
+			yield UsageCost(
+				tenancy_name, item['serviceName'], item['resourceName'], partNum, cost['computedQuantity'],
+				cost['unitPrice'], cost['computedAmount'], item['currency'], cost['overagesFlag'],
+				cost['computeType'], calc_unit_price, calc_line_item_cost, list_unit_price, list_line_cost)
@@ -0,0 +1,71 @@
+# ocicloud/metrics.py
+#
+# Bucket and file system sizes from the Monitoring service, in bulk
+#
+# Listing the size of each bucket (get_bucket with approximateSize, slow for buckets with millions of objects) or
+# file system (get_file_system) takes a request per resource. The stored bytes metrics of every bucket and file
+# system in a compartment come back from one summarize_metrics_data request per metric instead, so sizing costs
+# a few requests per compartment (or per region, for the whole tenancy) whatever the number of resources.
+#
+# The metrics are emitted periodically (buckets about once an hour, file systems more often), so the latest value
+# within the last window_hours is used. Resources with no recent value (e.g. just created) are not in the result,
+# and have to be looked up one at a time.
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import datetime
+
+import oci
+
+from ocicloud import trace
+
+window_hours = 48
+
+# Resource type, namespace, query and the dimension holding the resource OCID of each stored bytes metric
+# Bucket sizes have a value per storage tier (standard, archive etc.), which are added up
+storage_metrics = [
+	('bucket', 'oci_objectstorage', 'StoredBytes[1h].max()', 'resourceID'),
+	('filesystem', 'oci_filestorage', 'FileSystemUsage[1h].max()', 'resourceId'),
+]
+
+
+# Latest value of each metric stream (one per resource and dimension combination, e.g. storage tier)
+def latest_values(metric_data, id_dimension):
+	for metric in metric_data:
+		if len(metric.aggregated_datapoints) == 0:
+			continue
+		resource_id = metric.dimensions.get(id_dimension)
+		if resource_id is None:
+			continue
+		latest = max(metric.aggregated_datapoints, key=lambda d: d.timestamp)
+		yield resource_id, latest.value
+
+
+# Stored bytes of the resources of the given types (bucket, filesystem) in the compartments, by resource OCID
+# With tenancy_id (and compartment_ids None) the whole tenancy is summarised in one request per metric
+def get_storage_bytes(monitoring_client, resource_types, compartment_ids=None, tenancy_id=None):
+	end_time = datetime.datetime.now(datetime.timezone.utc)
+	start_time = end_time - datetime.timedelta(hours=window_hours)
+
+	if compartment_ids is None:
+		requests = [(tenancy_id, True)]
+	else:
+		requests = [(c, False) for c in compartment_ids]
+
+	storage_bytes = {}
+	for resource_type, namespace, query, id_dimension in storage_metrics:
+		if resource_type not in resource_types:
+			continue
+
+		details = oci.monitoring.models.SummarizeMetricsDataDetails(
+			namespace=namespace, query=query, start_time=start_time, end_time=end_time, resolution='1h')
+
+		for compartment_id, in_subtree in requests:
+			with trace.span('storage metrics', namespace=namespace):
+				metric_data = monitoring_client.summarize_metrics_data(
+					compartment_id, details, compartment_id_in_subtree=in_subtree).data
+
+			for resource_id, value in latest_values(metric_data, id_dimension):
+				storage_bytes[resource_id] = storage_bytes.get(resource_id, 0.0) + value
+
+	return storage_bytes
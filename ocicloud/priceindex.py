@@ -0,0 +1,187 @@
+# ocicloud/priceindex.py
+#
+# Multi-currency price catalogue (all SKUs, price bands per currency and pricing model) as a compact binary file,
+# looked up through a memory map, so other tools can price SKUs without calling the price list API or parsing text
+#
+#	with PriceIndex('./log/oci-prices.idx') as index:
+#		bands = index.price_bands('B88327', 'EUR', pricing.MONTHLY)		# PriceBands, or None
+#
+# File layout (little-endian):
+#	header		magic, version, currency count, SKU count, offsets of the records, bands and strings
+#	currencies	4 bytes each (currency code, NUL padded)
+#	records		one per SKU, sorted by part number (fixed size, so found by binary search):
+#				part number (16 bytes), name, category and metric (string offsets), then for each currency and model
+#				(PAYG, MONTHLY) the first band and number of bands (0 if the SKU has no price)
+#	bands		lower limit and unit price (two doubles) of each band
+#	strings		UTF-8, each preceded by its length (2 bytes)
+#
+# Opening an index reads the header only; pages of the file are read by the OS as lookups touch them.
+#
+# 19-oct-2026	Martin Bridge	Created
+
+import mmap
+import os
+import struct
+
+from ocicloud import pricing
+
+MAGIC = b'OCIPRIX1'
+VERSION = 1
+
+models = (pricing.PAYG, pricing.MONTHLY)
+
+_header = struct.Struct('<8sHHIIII')
+_currency = struct.Struct('<4s')
+_record_head = struct.Struct('<16sIII')
+_band_ref = struct.Struct('<IH')
+_band = struct.Struct('<dd')
+_string_length = struct.Struct('<H')
+
+
+def _record_size(currency_count):
+	return _record_head.size + _band_ref.size * len(models) * currency_count
+
+
+# Write a catalogue (see pricing.get_price_catalogue) for the given currencies to an index file
+def write_index(path, catalogue, currencies):
+	records = bytearray()
+	bands = bytearray()
+	strings = bytearray()
+	string_offsets = {}
+	band_count = 0
+
+	def string_offset(value):
+		offset = string_offsets.get(value)
+		if offset is None:
+			encoded = value.encode('utf-8')[:65535]
+			offset = string_offsets[value] = len(strings)
+			strings.extend(_string_length.pack(len(encoded)) + encoded)
+		return offset
+
+	for part_number in sorted(catalogue):
+		sku = catalogue[part_number]
+		records.extend(_record_head.pack(
+			part_number.encode('ascii'), string_offset(sku['name']), string_offset(sku['category']),
+			string_offset(sku['metric'])))
+
+		for currency in currencies:
+			for model in models:
+				price_bands = sku['prices'].get(currency, {}).get(model)
+				if price_bands is None:
+					records.extend(_band_ref.pack(0, 0))
+					continue
+
+				records.extend(_band_ref.pack(band_count, len(price_bands.prices)))
+				for lower, price in zip(price_bands.lower, price_bands.prices):
+					bands.extend(_band.pack(lower, price))
+				band_count += len(price_bands.prices)
+
+	records_offset = _header.size + _currency.size * len(currencies)
+	bands_offset = records_offset + len(records)
+	strings_offset = bands_offset + len(bands)
+
+	# Write to a temporary file first so readers never see a partly written index
+	tmp_path = path + '.tmp'
+	with open(tmp_path, 'wb') as f:
+		f.write(_header.pack(
+			MAGIC, VERSION, len(currencies), len(catalogue), records_offset, bands_offset, strings_offset))
+		for currency in currencies:
+			f.write(_currency.pack(currency.encode('ascii')))
+		f.write(records)
+		f.write(bands)
+		f.write(strings)
+	os.replace(tmp_path, path)
+
+
+class PriceIndex:
+
+	def __init__(self, path):
+		self._file = open(path, 'rb')
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		magic, version, currency_count, self.sku_count, self._records, self._bands, self._strings = \
+			_header.unpack_from(self._map, 0)
+		if magic != MAGIC or version != VERSION:
+			self.close()
+			raise ValueError(f'{path} is not a price index (version {VERSION})')
+
+		self.currencies = [
+			_currency.unpack_from(self._map, _header.size + i * _currency.size)[0].rstrip(b'\0').decode('ascii')
+			for i in range(currency_count)]
+		self._record_size = _record_size(currency_count)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def __len__(self):
+		return self.sku_count
+
+	def close(self):
+		self._map.close()
+		self._file.close()
+
+	def _part_number(self, i):
+		start = self._records + i * self._record_size
+		return self._map[start:start + 16].rstrip(b'\0')
+
+	# Record number of a part number, or None
+	def _find(self, part_number):
+		key = part_number.encode('ascii')
+		low, high = 0, self.sku_count
+		while low < high:
+			middle = (low + high) // 2
+			if self._part_number(middle) < key:
+				low = middle + 1
+			else:
+				high = middle
+		if low < self.sku_count and self._part_number(low) == key:
+			return low
+		return None
+
+	def _string(self, offset):
+		start = self._strings + offset
+		length, = _string_length.unpack_from(self._map, start)
+		return self._map[start + _string_length.size:start + _string_length.size + length].decode('utf-8')
+
+	def _price_bands(self, i, currency_index, model_index):
+		offset = self._records + i * self._record_size + _record_head.size + \
+			_band_ref.size * (currency_index * len(models) + model_index)
+		first, count = _band_ref.unpack_from(self._map, offset)
+		if count == 0:
+			return None
+		return pricing.PriceBands(
+			_band.unpack_from(self._map, self._bands + (first + b) * _band.size) for b in range(count))
+
+	# Part numbers in the index, in order
+	def part_numbers(self):
+		return [self._part_number(i).decode('ascii') for i in range(self.sku_count)]
+
+	# Price bands of a SKU in a currency and model (pricing.PAYG or pricing.MONTHLY), None if it has no price
+	def price_bands(self, part_number, currency, model=pricing.MONTHLY):
+		i = self._find(part_number)
+		if i is None or currency not in self.currencies:
+			return None
+		return self._price_bands(i, self.currencies.index(currency), models.index(model))
+
+	# Everything about a SKU: {name, category, metric, prices: {currency: {model: PriceBands}}}, None if not found
+	def lookup(self, part_number):
+		i = self._find(part_number)
+		if i is None:
+			return None
+
+		_, name, category, metric = _record_head.unpack_from(self._map, self._records + i * self._record_size)
+		prices = {}
+		for c, currency in enumerate(self.currencies):
+			currency_prices = {}
+			for m, model in enumerate(models):
+				price_bands = self._price_bands(i, c, m)
+				if price_bands is not None:
+					currency_prices[model] = price_bands
+			prices[currency] = currency_prices
+
+		return {
+			'name': self._string(name), 'category': self._string(category), 'metric': self._string(metric),
+			'prices': prices}
@@ -0,0 +1,203 @@
+# ocicloud/pricing.py
+#
+# Banded (tiered) list prices from the Oracle price list API
+#
+# Some SKUs are priced in bands, e.g. B88327 (Outbound Data Transfer) is free for the first 10TB then charged
+# for anything above that. Each SKU's bands are kept as compact sorted arrays, so the list cost of any quantity
+# (or of a whole batch of line items, using the cumulative quantity per SKU) is a lookup and a multiply.
+#
+# Bands are monthly (e.g. 10TB free each month), so the cumulative quantity starts again each billing month when
+# the line items say which month they are for. Usage fetched as a single TOTAL over more than a month can't be
+# split by month, so a free tier is only counted once and the list cost of banded SKUs is overstated.
+#
+# See: https://oc-blog.com/2020/01/22/undocumented-oci-pricelist-api/
+#
+# The API returns at most page_size items per request, so the catalogue is read a page at a time. Once the first
+# page says there are more, the following pages are requested concurrently (max_workers at a time) until one
+# comes back short, and several currencies are fetched at the same time (see get_price_catalogue).
+#
+# 19-oct-2026	Martin Bridge	Created (from price list code in usage_cost_total.py and oci-prices.py)
+# 19-oct-2026	Martin Bridge	Read all pages of the price list; multi-currency catalogue
+# 19-oct-2026	Martin Bridge	Price bands apply per billing month (see list_line_costs periods)
+
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+
+from ocicloud import client, trace
+
+price_list_url = "https://itra.oraclecloud.com/itas/.anon/myservices/api/v1/products"
+page_size = 500             # Items per request (the most the API returns)
+max_workers = 8             # Pages requested at the same time, per currency
+
+PAYG = 'PAY_AS_YOU_GO'
+MONTHLY = 'MONTHLY_COMMIT'
+
+
+class PriceBands:
+	__slots__ = ('lower', 'prices', 'base_cost')
+
+	# bands is a list of (lower limit, unit price), the upper limit of a band is the lower limit of the next one
+	def __init__(self, bands):
+		bands = sorted(bands)
+		if len(bands) == 0 or bands[0][0] > 0:
+			bands.insert(0, (0.0, 0.0))
+
+		self.lower = array('d', (b[0] for b in bands))
+		self.prices = array('d', (b[1] for b in bands))
+
+		# Cost of the quantity below the start of each band
+		self.base_cost = array('d', [0.0])
+		for i in range(1, len(bands)):
+			self.base_cost.append(self.base_cost[i - 1] + (self.lower[i] - self.lower[i - 1]) * self.prices[i - 1])
+
+	def is_banded(self):
+		return len(self.prices) > 1
+
+	# Unit price of the band containing the given (cumulative) quantity
+	def unit_price(self, quantity=0.0):
+		return self.prices[max(bisect_right(self.lower, quantity) - 1, 0)]
+
+	# Cost of the total quantity used so far
+	def cumulative_cost(self, quantity):
+		i = max(bisect_right(self.lower, quantity) - 1, 0)
+		return self.base_cost[i] + (quantity - self.lower[i]) * self.prices[i]
+
+	# Readable form, e.g. '0.0085' or '0.0<10240;0.0085'
+	def __str__(self):
+		if not self.is_banded():
+			return str(self.prices[0])
+
+		bands = []
+		for i in range(len(self.prices) - 1):
+			bands.append(f'{self.prices[i]}<{self.lower[i + 1]:g}')
+		bands.append(str(self.prices[-1]))
+		return ';'.join(bands)
+
+
+# Bands for one pricing model from the 'prices' entry of a price list item, or None if the SKU has no price
+def item_price_bands(item, model):
+	# Some items, such as 'B94418 - Oracle Cloud Program - Universal Credits - Research Cloud Starter',
+	# do not have a price entry
+	bands = {}
+	for price in item.get('prices', []):
+		if price['model'] == model:
+			# Entries without a range apply from zero (if repeated, the last one wins)
+			bands[float(price.get('rangeMin') or 0.0)] = float(price['value'])
+
+	if len(bands) == 0:
+		return None
+
+	return PriceBands(bands.items())
+
+
+# One page of price list items, and whether there are more after it
+def get_price_page(currency_code, offset):
+	http_header = {'X-Oracle-Accept-CurrencyCode': currency_code}
+	with trace.span('price list page', currency=currency_code, offset=offset):
+		resp = client.get(price_list_url, params={'limit': page_size, 'offset': offset}, headers=http_header)
+	page = resp.json()
+	items = page['items']
+	return items, page.get('hasMore', False) and len(items) > 0
+
+
+# All price list items (SKUs) in the given currency
+def get_price_items(currency_code):
+	items, has_more = get_price_page(currency_code, 0)
+	offset = step = len(items)      # The API may return fewer than page_size per page
+
+	if has_more:
+		with ThreadPoolExecutor(max_workers=max_workers) as executor:
+			while has_more:
+				# The number of pages isn't known up front, so request the next max_workers pages and stop at the
+				# first that says there are no more (any after that are empty)
+				offsets = [offset + i * step for i in range(max_workers)]
+				for page_items, page_has_more in executor.map(lambda o: get_price_page(currency_code, o), offsets):
+					if has_more:
+						items.extend(page_items)
+						offset += len(page_items)
+						has_more = page_has_more
+
+	return items
+
+
+# Catalogue of every SKU in all the given currencies, fetched concurrently, keyed by part number:
+#	{part number: {name, category, metric, prices: {currency: {PAYG/MONTHLY: PriceBands}}}}
+# Names are taken from the first currency listing the SKU, and a SKU missing from a currency has no prices in it
+def get_price_catalogue(currency_codes):
+	with ThreadPoolExecutor(max_workers=len(currency_codes)) as executor:
+		currency_items = list(executor.map(get_price_items, currency_codes))
+
+	catalogue = {}
+	for currency_code, items in zip(currency_codes, currency_items):
+		for item in items:
+			sku = catalogue.get(item['partNumber'])
+			if sku is None:
+				# Some items do not have a category or metric
+				sku = catalogue[item['partNumber']] = {
+					'name': item.get('shortDisplayName', ''),
+					'category': item.get('serviceCategoryDisplayName', 'None'),
+					'metric': item.get('metricDisplayName', 'None'),
+					'prices': {}}
+
+			prices = {}
+			for model in (PAYG, MONTHLY):
+				bands = item_price_bands(item, model)
+				if bands is not None:
+					prices[model] = bands
+			sku['prices'][currency_code] = prices
+
+	return catalogue
+
+
+# Price bands for every SKU with a price in the given model (dict of part number -> PriceBands)
+def get_price_list(currency_code, model=MONTHLY):
+	price_list = {}
+	for item in get_price_items(currency_code):
+		bands = item_price_bands(item, model)
+		if bands is not None:
+			price_list[item['partNumber']] = bands
+
+	return price_list
+
+
+# List cost of a batch of line items (parallel sequences of part number and quantity)
+# Bands apply to the running total of each SKU, in line item order, so a free tier is used up by the first
+# line items of that SKU. SKUs not in the price list cost zero.
+# periods (e.g. the billing month of each line item) starts the running totals again for each period, so a monthly
+# free tier is used once a month. Without periods the whole batch is one period.
+def list_line_costs(price_list, part_numbers, quantities, periods=None):
+	line_costs = array('d', bytes(8 * len(quantities)))
+
+	# Group line item positions by SKU (and period)
+	positions = {}
+	if periods is None:
+		for i, part_num in enumerate(part_numbers):
+			positions.setdefault(part_num, []).append(i)
+	else:
+		for i, key in enumerate(zip(part_numbers, periods)):
+			positions.setdefault(key, []).append(i)
+
+	for key, sku_positions in positions.items():
+		part_num = key if periods is None else key[0]
+		bands = price_list.get(part_num)
+		if bands is None:
+			continue
+
+		sku_quantities = [quantities[i] for i in sku_positions]
+
+		if not bands.is_banded():
+			# Flat price, no need for the running total
+			unit_price = bands.prices[0]
+			for i, qty in zip(sku_positions, sku_quantities):
+				line_costs[i] = qty * unit_price
+		else:
+			# Cost of each line is the increase in the cumulative cost of the SKU
+			previous_cost = 0.0
+			for i, total_qty in zip(sku_positions, accumulate(sku_quantities)):
+				total_cost = bands.cumulative_cost(total_qty)
+				line_costs[i] = total_cost - previous_cost
+				previous_cost = total_cost
+
+	return line_costs
@@ -0,0 +1,191 @@
+# ocicloud/psm.py
+#
+# PSM (Platform Service Manager) service instances in a tenancy (the requests behind psm-resources.py),
+# usable from other Python code
+#
+#	for service in iter_psm_services('mytenant'):
+#		print(service.service_type, service.service_name, service.state)
+#
+# Credentials and PSM endpoints for each tenancy are read from the config file (see ocicloud/metering.py), or can
+# be passed in as an account dictionary. All endpoints and service types are requested concurrently, and service
+# types found to be disabled or empty are remembered in a cache file so they are not requested again until the
+# entry expires. Services are produced in the same order every time, whatever order the responses arrive in.
+#
+# 19-oct-2026	Martin Bridge	Created (from psm-resources.py)
+# 19-oct-2026	Martin Bridge	Cache file read and written with ocicloud/jsonfile.py (results kept if it can't be written)
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+from ocicloud import client, jsonfile, metering, trace
+
+cache_file = './log/psm-cache.json'     # Service types found to be disabled or empty, per tenancy
+cache_ttl = 7 * 24 * 60 * 60            # Seconds before a cached service type is probed again
+default_psm_endpoints = 'https://psm.europe.oraclecloud.com'
+max_workers = 8                         # Concurrent PSM requests (all endpoints and service types)
+
+# Responses that mean the service type isn't available on the endpoint, so it can be skipped until the entry
+# expires. Anything else (e.g. 401/403 bad credentials, 429 throttling, 5xx) is reported but not cached, so it
+# doesn't hide the service type from later runs.
+disabled_status_codes = (400, 404)
+
+# Full list - many are disabled/obsolete in any given OCI account, but those are remembered in the
+# cache file (see skip_service_type) so they only cost a request when the cache entry expires
+service_type_list = [
+	"accs", "adbc", "adwc", "adwcp", "aiacs", "aipod", "analytics", "analyticssub", "andc", "andcp",
+	"apicatalog", "apics", "apicsauto", "apicsautopod", "autoanalytics", "autoanalyticsinst", "autoanalyticspod",
+	"autoblockchain", "bcsmgr", "bcsmgrpod", "bdcsce", "bigdataappliance", "botmxp", "botsaasauto",
+	"botscfg", "botscon", "botsint", "botsmgm", "botspip", "botsxp", "caching", "cec", "cecauto", "cecs", "cecsauto",
+	"container", "containerpod", "cxaana", "cxacfg", "cxacol", "cxapod", "dbcs", "demo",
+	"devserviceapp", "devserviceappauto", "devservicepod", "devservicepodauto", "dhcs", "dics",
+	"dipcauto", "dipcinst", "dipcpod", "erp", "ggcs", "integrationcauto", "integrationcloud",
+	"iotassetmon", "iotconnectedwrker", "iotenterpriseapps", "iotfleetmon", "iotjls", "iotprodmonitoring", "iotsvcasset",
+	"jcs", "mobileccc", "mobilecccom", "mobilecorepod", "mobilecorepodom", "mobileserviceauto",
+	"mobilestandard", "mobilestdccc", "mobilestdcore", "mysqlcs", "oabcsinst", "oabcspod", "oaics",
+	"oehcs", "oehpcs", "oicinst", "oicpod", "oicsubinst", "omce", "omcexternal", "omcp",
+	"ratscontrolplane", "search", "searchcloudapp", "soa", "ssi", "ssip",
+	# "stack",
+	"vbinst", "vbpod", "visualbuilder", "visualbuilderauto", "wtss"]
+
+
+class PsmService:
+	__slots__ = ('tenancy', 'endpoint', 'service_type', 'service_name', 'creator', 'state', 'region', 'creation_date')
+
+	def __init__(self, tenancy, endpoint, service_type, service_name, creator, state, region, creation_date):
+		self.tenancy = tenancy
+		self.endpoint = endpoint
+		self.service_type = service_type
+		self.service_name = service_name
+		self.creator = creator
+		self.state = state
+		self.region = region
+		self.creation_date = creation_date
+
+
+# PSM endpoints (data centres) to scan for a tenancy (psm_endpoints in the config file, comma separated)
+def account_endpoints(account):
+	return [e.strip().rstrip('/') for e in account.get('psm_endpoints', default_psm_endpoints).split(',')]
+
+
+# Get all instances of one service type from one PSM endpoint
+def get_psm_instances(endpoint, service_type, username, password, idcs_guid):
+	with trace.span('psm fetch', endpoint=endpoint, service_type=service_type):
+		resp = client.get(
+			endpoint + "/paas/api/v1.1/instancemgmt/"
+			+ idcs_guid + "/services/" + service_type + "/instances?limit=500",
+			auth=(username, password),
+			idcs_guid=idcs_guid
+		)
+
+		if resp.status_code != 200:
+			return resp.status_code, resp.reason, []
+
+		return resp.status_code, resp.reason, [svc for _, svc in resp.json()['services'].items()]
+
+
+# Load the cached service type entries for a tenancy (endpoint -> service_type -> {status, time})
+# No cache yet, or unreadable, means probe everything
+def cache_load(tenancy_name):
+	return jsonfile.load(cache_file).get(tenancy_name, {})
+
+
+# Save the service type entries for a tenancy, keeping entries for other tenancies
+# The cache only saves requests, so the services found are still returned if it can't be written
+def cache_save(tenancy_name, service_cache):
+	cache = jsonfile.load(cache_file)
+	cache[tenancy_name] = service_cache
+	jsonfile.save(cache_file, cache)
+
+
+# Service types that were disabled or empty are skipped until their cache entry expires (periodic re-probe)
+def skip_service_type(service_cache, service_type):
+	entry = service_cache.get(service_type)
+	return entry is not None and time.time() - entry['time'] < cache_ttl
+
+
+# All PSM service instances of a tenancy, on the given endpoints (default: from the account)
+# refresh ignores the cache and probes all service types; failed requests (e.g. a disabled service type) are
+# passed to on_error(endpoint, service_type, message) if given, then skipped. on_skipped(count) is given the
+# number of requests not made because the cache has them as disabled or empty.
+def iter_psm_services(tenancy_name, account=None, endpoints=None, refresh=False, on_error=None, on_skipped=None):
+	if account is None:
+		account = metering.get_account(tenancy_name)
+	if endpoints is None:
+		endpoints = account_endpoints(account)
+
+	with trace.span('cache load'):
+		service_cache = {} if refresh else cache_load(tenancy_name)
+
+	# One request per endpoint and service type, all run concurrently, skipping any cached as disabled/empty
+	work = []
+	skipped = 0
+	for endpoint in endpoints:
+		endpoint_cache = service_cache.setdefault(endpoint, {})
+		for service_type in service_type_list:
+			if skip_service_type(endpoint_cache, service_type):
+				skipped += 1
+			else:
+				work.append((endpoint, service_type))
+
+	if on_skipped is not None:
+		on_skipped(skipped)
+
+	# The same service can be reported by more than one endpoint, so only report it once
+	seen_services = set()
+
+	with ThreadPoolExecutor(max_workers=max_workers) as executor:
+		futures = [
+			executor.submit(
+				get_psm_instances, endpoint, service_type, account['username'], account['password'],
+				account['idcs_guid'])
+			for endpoint, service_type in work]
+
+		# Results are handled in submission order so output is the same regardless of response timing
+		for (endpoint, service_type), future in zip(work, futures):
+			endpoint_cache = service_cache[endpoint]
+			endpoint_name = urlparse(endpoint).hostname
+
+			try:
+				status_code, reason, services = future.result()
+			except requests.exceptions.RequestException as error:
+				if on_error is not None:
+					on_error(endpoint_name, service_type, str(error))
+				continue
+
+			if status_code != 200:
+				# This means something went wrong.
+				if on_error is not None:
+					on_error(endpoint_name, service_type, f'{status_code} ({reason})')
+				if status_code in disabled_status_codes:
+					endpoint_cache[service_type] = {'status': 'disabled', 'time': time.time()}
+				continue
+
+			if len(services) == 0:
+				endpoint_cache[service_type] = {'status': 'empty', 'time': time.time()}
+			else:
+				endpoint_cache.pop(service_type, None)
+
+			for svc in services:
+				# Region not always available (e.g. when service initializing)
+				reg = svc.get('region', "N/A")
+
+				service_key = (svc['serviceType'], svc['serviceName'], reg)
+				if service_key in seen_services:
+					continue
+				seen_services.add(service_key)
+
+				dttm = datetime.strptime(svc['creationDate'], "%Y-%m-%dT%H:%M:%S.%f%z")
+				create_date = datetime.strftime(dttm, "%Y-%m-%d %H:%M:%S")
+
+				yield PsmService(
+					tenancy_name, endpoint_name, svc['serviceType'], svc['serviceName'], svc['creator'],
+					svc['state'], reg, create_date)
+
+			# TODO: Handle isBYOL flag
+
+	with trace.span('cache save'):
+		cache_save(tenancy_name, service_cache)
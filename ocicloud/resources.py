@@ -0,0 +1,481 @@
+# ocicloud/resources.py
+#
+# Resources in an OCI tenancy (the search and enrichment behind oci-resources.py), usable from other Python code
+#
+#	tenancy = open_tenancy('myprofile')				# config, tenancy name, subscribed regions, compartment tree
+#	for row in iter_resources(tenancy, types=['instance']):
+#		print(row.name, row.ocpu)
+#
+# Rows are InventoryRow records (see ocicloud/inventory.py), produced lazily as search pages are read. A Tenancy
+# keeps its SDK clients (one set per region), so repeated calls in one process don't pay for them again.
+# Nothing here prints, and the only file written is the region capability cache (see ocicloud/capabilities.py);
+# errors from the SDK are raised to the caller.
+#
+# 19-oct-2026	Martin Bridge	Created (from oci-resources.py)
+# 19-oct-2026	Martin Bridge	Types a region doesn't support are found by probing (see ocicloud/capabilities.py)
+# 19-oct-2026	Martin Bridge	Option to size buckets and file systems from Monitoring metrics (see ocicloud/metrics.py)
+# 19-oct-2026	Martin Bridge	Size buckets and file systems one at a time if the Monitoring metrics can't be read
+# 19-oct-2026	Martin Bridge	Trace enrichment per search page rather than per resource (count and time per type)
+# 19-oct-2026	Martin Bridge	A tag filter without '=value' matches resources with the tag, whatever its value
+
+import itertools
+import time
+import types
+
+import oci
+
+from ocicloud import capabilities, metrics, trace
+from ocicloud.inventory import InventoryRow
+
+# Fixed strings
+BYOL = "BYOL"
+NONBYOL = "*NON-BYOL*"
+
+# TODO: ADD:
+# ApiGateway 1M msgs/month
+# OKE
+# DataSafePrivateEndpoint (endpoints per month)
+# bastion
+
+# Resource types searched in each region (unless filtered by type)
+resource_types = [
+	'autonomousdatabase', 'autonomouscontainerdatabase', 'analyticsinstance',
+	'bootvolume', 'bootvolumebackup', 'bucket', 'database', 'dbsystem',
+	'datasafeprivateendpoint', 'loadbalancer', 'volumegroup',
+	'apigateway', 'apideployment',
+	'datasciencemodel', 'datasciencenotebooksession', 'datascienceproject',
+	'filesystem', 'functionsapplication', 'functionsfunction',
+	'image', 'instance', 'integrationinstance',
+	'mounttarget', 'oceinstance',
+	'odainstance', 'vault', 'vaultsecret', 'volume', 'volumegroup', 'volumebackup', 'volumegroupbackup'
+]
+# resource_types = ['all']
+
+# Skip compartments as a resource type (OCI where clause doesn't seem to support this filter)
+exclude_types = ['Compartment', 'User']
+
+# No filters, None means all values
+no_filters = {'types': None, 'regions': None, 'states': None, 'tags': None, 'creators': None}
+
+
+# A tenancy as seen from one config profile: SDK config, name, subscribed region names and the compartment tree
+# (list of dictionaries with id, name, path and state), plus the SDK clients for each region once used
+class Tenancy:
+
+	def __init__(self, config, name, regions, compartment_list):
+		self.config = config
+		self.name = name
+		self.regions = regions
+		self.compartment_list = compartment_list
+		self.compartment_paths = {c['id']: c['path'] for c in compartment_list}
+		self._clients = {}
+
+	# Compartment full name (path)
+	def compartment_path(self, compartment_id):
+		return self.compartment_paths.get(compartment_id, 'Not Found')
+
+	# SDK clients for a region, created on first use
+	def clients(self, region_name):
+		region_clients = self._clients.get(region_name)
+		if region_clients is None:
+			config = dict(self.config, region=region_name)
+			region_clients = types.SimpleNamespace(
+				search=oci.resource_search.ResourceSearchClient(config),
+				database=oci.database.DatabaseClient(config),
+				compute=oci.core.ComputeClient(config),
+				analytics=oci.analytics.AnalyticsClient(config),
+				integration=oci.integration.IntegrationInstanceClient(config),
+				block_storage=oci.core.BlockstorageClient(config),
+				object_storage=oci.object_storage.ObjectStorageClient(config),
+				file_storage=oci.file_storage.FileStorageClient(config),
+				monitoring=oci.monitoring.MonitoringClient(config))
+			self._clients[region_name] = region_clients
+		return region_clients
+
+
+# Traverse the compartment list to build the full compartment path
+def traverse(compartments, parent_id, parent_path, compartment_list):
+	next_level_compartments = [c for c in compartments if c.compartment_id == parent_id]
+
+	for compartment in next_level_compartments:
+		# Skip the CASB compartment as it's only a proxy and throws an error
+		# CASB compartment does not show up in the OCI console
+		# Only look at ACTIVE compartments (deleted ones are still returned and throw permission errors)
+		if compartment.name[0:17] != 'casb_compartment.' and compartment.lifecycle_state == 'ACTIVE':
+			path = parent_path + '/' + compartment.name
+			compartment_list.append(
+				dict(id=compartment.id, name=compartment.name, path=path, state=compartment.lifecycle_state)
+			)
+			traverse(compartments, parent_id=compartment.id, parent_path=path, compartment_list=compartment_list)
+	return compartment_list
+
+
+# Load the config profile (from ~/.oci/config) and look up the tenancy's name, regions and compartment tree
+# below base_compartment_id (None for the whole tenancy)
+def open_tenancy(profile, base_compartment_id=None):
+	with trace.span('config load'):
+		config = oci.config.from_file(profile_name=profile)
+	tenancy_id = config['tenancy']
+
+	identity = oci.identity.IdentityClient(config)
+	tenancy_name = identity.get_tenancy(tenancy_id).data.name
+
+	# Get Regions
+	regions = [r.region_name for r in identity.list_region_subscriptions(tenancy_id).data]
+
+	if base_compartment_id is None:
+		base_compartment_id = tenancy_id
+
+	# Get list of all compartments in tenancy
+	with trace.span('compartment list'):
+		compartments = oci.pagination.list_call_get_all_results(
+			identity.list_compartments, tenancy_id,
+			compartment_id_in_subtree=True).data
+
+	comp = identity.get_compartment(base_compartment_id).data
+	base_compartment_name = comp.name
+	base_path = '/' + base_compartment_name
+
+	# Got the flat list of compartments, now construct full path of each which makes it much easier to locate resources
+	# Start with base compartment in dictionary
+	compartment_path_list = [dict(id=base_compartment_id, name=base_compartment_name, path=base_path, state='Root')]
+
+	# Recurse through all compartments starting at the required root to produce a sub-tree
+	# with a path field like: /root/comp1/sub-comp1 etc.
+	with trace.span('compartment traversal'):
+		compartment_path_list = traverse(compartments, base_compartment_id, base_path, compartment_path_list)
+		compartment_path_list = sorted(compartment_path_list, key=lambda c: c['path'].lower())
+
+	return Tenancy(config, tenancy_name, regions, compartment_path_list)
+
+
+# Search results one page at a time, starting from the given page token (None for the first page)
+# Yields the resources in each page and the token for the next page (None after the last page)
+def search_pages(resource_search_client, search_spec, page):
+	while True:
+		with trace.span('search page', page=page):
+			response = resource_search_client.search_resources(search_details=search_spec, page=page)
+		page = response.next_page
+		yield response.data.items, page
+		if page is None:
+			break
+
+
+# Resource types to search for in a region (before removing any the region doesn't support)
+def get_region_resource_types(region_name, filters):
+	return list(resource_types if filters['types'] is None else filters['types'])
+
+
+# Search query conditions for the filters the search language supports (state and defined tags)
+# Creator is matched after the search (the tag value has a prefix), but only resources with the tag are returned
+def filter_conditions(filters):
+	conditions = ''
+
+	if filters['states'] is not None:
+		conditions += ' && (' + ' || '.join(f"lifecycleState = '{state}'" for state in filters['states']) + ')'
+
+	# A tag given without '=value' matches any value (the resource only has to have the tag)
+	tags = [] if filters['tags'] is None else [t.partition('=') for t in filters['tags']]
+	if filters['creators'] is not None:
+		tags.append(('Owner.Creator', '', None))
+
+	for tag, sep, value in tags:
+		if sep == '':
+			value = None
+		namespace, _, key = tag.partition('.')
+		conditions += f" && (definedTags.namespace = '{namespace}' && definedTags.key = '{key}'"
+		if value is not None:
+			conditions += f" && definedTags.value = '{value}'"
+		conditions += ')'
+
+	return conditions
+
+
+# Where clause condition for a list of compartment ids ('' for no compartment filter)
+def compartment_condition(compartment_ids):
+	if compartment_ids is None:
+		return ''
+	return ' || '.join(f" compartmentId = '{c}'" for c in compartment_ids)
+
+
+# Volumes and boot volumes attached to instances, so we can later spot volumes that are unattached
+def get_attached_volumes(clients, compartment_filter):
+	attached_volumes = set()
+
+	with trace.span('attachment discovery'):
+		instance_search_spec = oci.resource_search.models.StructuredSearchDetails()
+		query_string = 'query Instance resources'
+		if compartment_filter != '':
+			query_string += ' where ' + compartment_filter
+
+		instance_search_spec.query = query_string
+		instances = clients.search.search_resources(search_details=instance_search_spec).data
+
+		for instance in instances.items:
+			compartment_id = instance.compartment_id
+			instance_id = instance.identifier
+			availability_domain = instance.availability_domain
+
+			# Find all volumes attached to instances
+			volume_attachments = oci.pagination.list_call_get_all_results(
+				clients.compute.list_volume_attachments,
+				compartment_id=compartment_id,
+				instance_id=instance_id
+			).data
+
+			# Find all boot volumes attached
+			boot_volume_attachments = oci.pagination.list_call_get_all_results(
+				clients.compute.list_boot_volume_attachments,
+				compartment_id=compartment_id,
+				instance_id=instance_id,
+				availability_domain=availability_domain
+			).data
+
+			# looping through all the volumes/bootVol attached and add it to the list
+			for volume in volume_attachments:
+				attached_volumes.add(volume.volume_id)
+
+			for bootVolume in boot_volume_attachments:
+				attached_volumes.add(bootVolume.boot_volume_id)
+
+	return attached_volumes
+
+
+# Creator (person) from the Owner.Creator dynamic tag, '' if the tag is missing
+def resource_creator(resource):
+	try:
+		# Only interested in tracking down the creator (person), so strip off the
+		# oracleidentitycloudservice/ before the username
+		return resource.defined_tags['Owner']['Creator'].replace('oracleidentitycloudservice/', '')
+	except:
+		# Ignore all errors such as tag missing
+		return ''
+
+
+# Inventory row for a search result, with the details (shape, size, licence etc.) looked up for its type
+# Bucket and file system sizes are taken from storage_bytes (OCID -> bytes) when they are in it
+def resource_row(tenancy, region_name, resource, clients, attached_volumes, created_by, storage_bytes=None):
+	# Some items do not have a display name (eg. Tag Namespace)
+	resource_name = '-' if resource.display_name is None else resource.display_name
+
+	db_workload = ''
+	shape = ''
+	cpu_core_count = 0
+	storage_gbs = 0.0
+	byol_flag = ''
+	volume_attachment_flag = ''
+
+	# Some items do not return a lifecycle state (eg. Tags)
+	state = '-' if resource.lifecycle_state is None else resource.lifecycle_state
+
+	if resource.resource_type == 'Instance':
+		resource_detail = clients.compute.get_instance(resource.identifier).data
+		shape = resource_detail.shape
+		cpu_core_count = int(resource_detail.shape_config.ocpus)
+
+	if storage_bytes is not None and resource.identifier in storage_bytes:
+		storage_gbs = storage_bytes[resource.identifier] / 1e9   # Bytes to Gigabytes
+
+	elif resource.resource_type == 'Bucket':
+		namespace = clients.object_storage.get_namespace().data
+		fields = ['approximateCount', 'approximateSize']
+		resource_detail = clients.object_storage.get_bucket(namespace, resource.display_name, fields=fields).data
+		storage_gbs = resource_detail.approximate_size / 1e9   # Bytes to Gigabytes
+
+	elif resource.resource_type == 'FileSystem':
+		resource_detail = clients.file_storage.get_file_system(resource.identifier).data
+		storage_gbs = resource_detail.metered_bytes / 1e9      # Bytes to Gigabytes
+
+	elif resource.resource_type == 'AutonomousDatabase':
+		resource_detail = clients.database.get_autonomous_database(resource.identifier).data
+		db_workload = resource_detail.db_workload
+		cpu_core_count = resource_detail.cpu_core_count
+		storage_gbs = resource_detail.data_storage_size_in_tbs * 1024.0
+		byol_flag = BYOL if resource_detail.license_model == "BRING_YOUR_OWN_LICENSE" else NONBYOL
+
+	elif resource.resource_type == 'Database':
+		resource_detail = clients.database.get_database(resource.identifier).data
+		resource_name = resource_detail.db_name
+
+	elif resource.resource_type == 'DbSystem':
+		resource_detail = clients.database.get_db_system(resource.identifier).data
+		shape = resource_detail.shape
+		storage_gbs = float(resource_detail.data_storage_size_in_gbs)
+		cpu_core_count = resource_detail.cpu_core_count
+		node_count = resource_detail.node_count
+
+		# Get status of DB Node instead of the dbsystem
+		# This more accurately reflects the status of the DB Server
+		node_list = clients.database.list_db_nodes(resource.compartment_id, db_system_id=resource.identifier)
+
+		state = 'STOPPED (NODE)'
+		for node in node_list.data:
+			if node.lifecycle_state == 'AVAILABLE':
+				state = 'AVAILABLE(NODE)'
+
+		if node_count is not None and node_count > 1:
+			shape = shape + '(x' + str(node_count) + ')'
+
+		byol_flag = BYOL if resource_detail.license_model == "BRING_YOUR_OWN_LICENSE" else NONBYOL
+
+	elif resource.resource_type == 'Volume':
+		resource_detail = clients.block_storage.get_volume(resource.identifier).data
+		storage_gbs = float(resource_detail.size_in_gbs)
+
+	elif resource.resource_type == 'BootVolume':
+		resource_detail = clients.block_storage.get_boot_volume(resource.identifier).data
+		storage_gbs = float(resource_detail.size_in_gbs)
+
+	elif resource.resource_type == 'BootVolumeBackup':
+		resource_detail = clients.block_storage.get_boot_volume_backup(resource.identifier).data
+		storage_gbs = float(resource_detail.size_in_gbs)
+
+	elif resource.resource_type == 'AnalyticsInstance':
+		resource_detail = clients.analytics.get_analytics_instance(resource.identifier).data
+		if resource_detail.capacity.capacity_type == 'OLPU_COUNT':
+			cpu_core_count = int(resource_detail.capacity.capacity_value)
+		byol_flag = BYOL if resource_detail.license_type == "BRING_YOUR_OWN_LICENSE" else NONBYOL
+
+	elif resource.resource_type == 'IntegrationInstance':
+		resource_detail = clients.integration.get_integration_instance(resource.identifier).data
+		byol_flag = BYOL if resource_detail.is_byol else NONBYOL
+
+	# Check if volumes are in use
+	if resource.resource_type == 'Volume' or resource.resource_type == 'BootVolume':
+		volume_attachment_flag = "Attached" if resource.identifier in attached_volumes else "Not Attached"
+
+	return InventoryRow(
+		tenancy.name,
+		region_name,
+		tenancy.compartment_path(resource.compartment_id),
+		resource.resource_type,
+		resource_name,
+		state,
+		db_workload,
+		shape,
+		cpu_core_count,
+		storage_gbs,
+		byol_flag,
+		volume_attachment_flag,
+		resource.time_created.strftime("%Y-%m-%d %H:%M:%S"),
+		created_by,
+		resource.identifier
+	)
+
+
+# Search for all resources of the given types (that match the filters)
+def resource_search_spec(region_types, compartment_filter, filters):
+	resource_type_list = ', '.join(region_types)   # To comma sep string
+
+	# Not interested in terminated resources
+	query_filter = "where lifecycleState != 'DELETED' "
+	query_filter += "&& lifecycleState != 'TERMINATED' "
+	query_filter += "&& lifecycleState != 'Terminated' "
+	if compartment_filter != "":
+		query_filter += " && (" + compartment_filter + ") "
+	query_filter += filter_conditions(filters)
+	query_filter += " sorted by compartmentId asc"
+
+	search_spec = oci.resource_search.models.StructuredSearchDetails()
+	search_spec.query = f"query {resource_type_list} resources {query_filter}"
+	return search_spec
+
+
+# Resources in one region, one search page at a time: yields (list of InventoryRow, token for the next page)
+# query_compartment_ids limits the search to those compartments (None for the whole tenancy)
+# start_page carries on from a page token of an earlier search; resources in skip_ocids are left out
+# storage_metrics sizes buckets and file systems from Monitoring metrics (a request per compartment, or per region
+# for the whole tenancy), rather than a request for each one
+def iter_region_pages(
+		tenancy, region_name, filters, query_compartment_ids=None, start_page=None, skip_ocids=(),
+		storage_metrics=False):
+	clients = tenancy.clients(region_name)
+
+	# Some regions don't have all resource types, and the query fails, so only search for the ones it has
+	region_types = capabilities.supported_types(
+		clients.search, region_name, get_region_resource_types(region_name, filters))
+	if len(region_types) == 0:
+		# Nothing to search for in this region (all filtered out)
+		return
+
+	compartment_filter = compartment_condition(query_compartment_ids)
+
+	# Attachments are only needed to flag unattached volumes
+	attached_volumes = set()
+	if 'volume' in region_types or 'bootvolume' in region_types:
+		attached_volumes = get_attached_volumes(clients, compartment_filter)
+
+	storage_bytes = None
+	if storage_metrics and ('bucket' in region_types or 'filesystem' in region_types):
+		try:
+			storage_bytes = metrics.get_storage_bytes(
+				clients.monitoring, region_types, query_compartment_ids, tenancy.config['tenancy'])
+		except oci.exceptions.ServiceError:
+			# Metrics not readable (e.g. no 'read metrics' policy), so look up each bucket and file system instead
+			storage_bytes = None
+
+	search_spec = resource_search_spec(region_types, compartment_filter, filters)
+
+	try:
+		pages = search_pages(clients.search, search_spec, start_page)
+		first_page = next(pages)
+	except oci.exceptions.ServiceError as error:
+		if start_page is None:
+			if error.status != 400:
+				raise
+
+			# Rejected query, so a type the cache says is supported isn't (any more): probe them all again
+			region_types = capabilities.supported_types(clients.search, region_name, region_types, refresh=True)
+			if len(region_types) == 0:
+				return
+			search_spec = resource_search_spec(region_types, compartment_filter, filters)
+
+		# Page tokens expire, so search the region again from the start (the caller skips what it already has)
+		pages = search_pages(clients.search, search_spec, None)
+		first_page = next(pages)
+
+	for resources, next_page in itertools.chain([first_page], pages):
+		rows = []
+		# One span per page (not per resource, which makes huge traces), with the count and time of each type
+		with trace.span('enrich', resources=len(resources)) as span_args:
+			for resource in resources:
+				if resource.resource_type in exclude_types or resource.identifier in skip_ocids:
+					continue
+
+				created_by = resource_creator(resource)
+				if filters['creators'] is not None and created_by not in filters['creators']:
+					continue
+
+				start = time.perf_counter()
+				rows.append(resource_row(
+					tenancy, region_name, resource, clients, attached_volumes, created_by, storage_bytes))
+				type_time = span_args.setdefault(resource.resource_type, {'count': 0, 'ms': 0.0})
+				type_time['count'] += 1
+				type_time['ms'] += (time.perf_counter() - start) * 1000
+
+		yield rows, next_page
+
+
+# All resources in a tenancy (a Tenancy or a config profile name), as InventoryRow records
+# Each filter is a list of values, any of which matches (all tags must match), None for no filter
+# Tags are 'namespace.key=value', or 'namespace.key' for any value
+def iter_resources(
+		tenancy, compartment_id=None, types=None, regions=None, states=None, tags=None, creators=None,
+		storage_metrics=False):
+	if isinstance(tenancy, str):
+		tenancy = open_tenancy(tenancy, compartment_id)
+
+	filters = {
+		'types': None if types is None else [t.lower() for t in types],
+		'regions': regions, 'states': states, 'tags': tags, 'creators': creators}
+	query_compartment_ids = None if compartment_id is None else [c['id'] for c in tenancy.compartment_list]
+
+	for region_name in tenancy.regions:
+		if regions is not None and region_name not in regions:
+			continue
+
+		with trace.span('region', region=region_name):
+			pages = iter_region_pages(
+				tenancy, region_name, filters, query_compartment_ids, storage_metrics=storage_metrics)
+			for rows, _ in pages:
+				yield from rows
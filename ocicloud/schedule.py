@@ -0,0 +1,114 @@
+# ocicloud/schedule.py
+#
+# Scheduling of sharded resource scans (oci-resources.py --coordinator) using statistics from earlier runs
+#
+# Each run records, per region and resource type, how many resources were listed and how long they took (the time
+# between rows, so search page requests and detail lookups are included) in a small JSON stats file. The next run
+# estimates the cost of each unit of work from those numbers, splits any unit estimated to take longer than
+# target_unit_seconds (by resource type, then by halving its compartments) and queues the units largest first.
+# Workers take the next unit from the shared queue as soon as they finish one, so no worker sits idle while
+# another has a backlog, and the largest units are not left until the end of the run.
+#
+# Stats: {region: {type: {'count': resources, 'seconds': seconds}}}, types in lower case (as in resource_types)
+#
+# 19-oct-2026	Martin Bridge	Created
+# 19-oct-2026	Martin Bridge	Stats file read and written with ocicloud/jsonfile.py
+
+from ocicloud import jsonfile
+
+target_unit_seconds = 120      # Units estimated to take longer than this are split
+unit_overhead_seconds = 2.0     # Fixed cost of a unit (clients, first search request)
+default_type_seconds = 10.0     # Estimate for a region and type with no stats yet
+
+
+# Stats from earlier runs ({} if there are none yet)
+def load_stats(path):
+	return jsonfile.load(path)
+
+
+# Replace the stats of the regions and types in run_stats, keeping the others
+# Stats only improve the next plan, so a run carries on if they can't be written
+def save_stats(path, run_stats):
+	stats = load_stats(path)
+	for region_name, region_stats in run_stats.items():
+		stats.setdefault(region_name, {}).update(region_stats)
+	jsonfile.save(path, stats)
+
+
+# Count a resource listed in seconds
+def add_row(stats, region_name, resource_type, seconds):
+	type_stats = stats.setdefault(region_name, {}).setdefault(resource_type.lower(), {'count': 0, 'seconds': 0.0})
+	type_stats['count'] += 1
+	type_stats['seconds'] += seconds
+
+
+# Add stats together (e.g. from several units of work in the same region)
+def merge_stats(stats, other):
+	for region_name, region_stats in other.items():
+		for resource_type, type_stats in region_stats.items():
+			total = stats.setdefault(region_name, {}).setdefault(resource_type, {'count': 0, 'seconds': 0.0})
+			total['count'] += type_stats['count']
+			total['seconds'] += type_stats['seconds']
+	return stats
+
+
+# Estimated seconds for one type in a unit, assuming resources are spread evenly over compartments
+def type_estimate(stats, region_name, resource_type, unit, compartment_count):
+	type_stats = stats.get(region_name, {}).get(resource_type)
+	seconds = default_type_seconds if type_stats is None else type_stats['seconds']
+
+	if unit['compartments'] is not None and compartment_count > 0:
+		seconds *= min(1.0, len(unit['compartments']) / compartment_count)
+	return seconds
+
+
+def unit_estimate(stats, unit, compartment_count):
+	return unit_overhead_seconds + sum(
+		type_estimate(stats, unit['region'], t, unit, compartment_count) for t in unit['types'])
+
+
+# Split a unit in two: by resource type (types in unchunked_types stay together), otherwise by compartment
+# (unless it has unchunked types, which are always searched over all compartments). [unit] if it can't be split
+def split_unit(stats, unit, compartment_count, unchunked_types):
+	blocks = [[t] for t in unit['types'] if t not in unchunked_types]
+	unchunked = [t for t in unit['types'] if t in unchunked_types]
+	if len(unchunked) > 0:
+		blocks.append(unchunked)
+
+	if len(blocks) > 1:
+		# Largest blocks first, each to the lighter half
+		def block_estimate(block):
+			return sum(type_estimate(stats, unit['region'], t, unit, compartment_count) for t in block)
+
+		halves = [[], []]
+		loads = [0.0, 0.0]
+		for block in sorted(blocks, key=block_estimate, reverse=True):
+			lighter = 0 if loads[0] <= loads[1] else 1
+			halves[lighter] += block
+			loads[lighter] += block_estimate(block)
+		return [dict(unit, types=half) for half in halves]
+
+	if len(unchunked) == 0 and unit['compartments'] is not None and len(unit['compartments']) > 1:
+		middle = len(unit['compartments']) // 2
+		return [dict(unit, compartments=unit['compartments'][:middle]),
+				dict(unit, compartments=unit['compartments'][middle:])]
+
+	return [unit]
+
+
+# Units split to target_unit_seconds where possible, largest first, each with its 'estimate' (seconds)
+def plan_units(units, stats, compartment_count, unchunked_types=()):
+	planned = []
+	pending = list(units)
+
+	while len(pending) > 0:
+		unit = pending.pop()
+		estimate = unit_estimate(stats, unit, compartment_count)
+		parts = split_unit(stats, unit, compartment_count, unchunked_types) if estimate > target_unit_seconds else [unit]
+
+		if len(parts) > 1:
+			pending.extend(parts)
+		else:
+			planned.append(dict(unit, estimate=round(estimate, 3)))
+
+	return sorted(planned, key=lambda u: u['estimate'], reverse=True)
@@ -0,0 +1,109 @@
+# ocicloud/summary.py
+#
+# Rollup totals of resource inventory rows (oci-resources.py --summary), built as the rows stream past
+#
+# Totals (resources, OCPU, GBytes, non-BYOL licences and unattached volumes) are kept for each compartment,
+# region and type. When the summary is read, each compartment's totals are added to all the compartments above
+# it in the path (/root/a/b counts towards /root/a and /root), so every compartment's totals include its
+# sub-compartments. Memory depends on the number of compartments, regions and types, not the number of rows.
+#
+# 19-oct-2026	Martin Bridge	Created
+
+from ocicloud.resources import NONBYOL
+
+# CSV column headings (rollup rows have '*' for region and type)
+field_names = ['Compartment', 'Region', 'Type', 'Resources', 'OCPU', 'GBytes', 'NonBYOL', 'Unattached']
+
+ALL = '*'
+
+
+class Totals:
+	__slots__ = ('resources', 'ocpu', 'gbytes', 'non_byol', 'unattached')
+
+	def __init__(self):
+		self.resources = 0
+		self.ocpu = 0
+		self.gbytes = 0.0
+		self.non_byol = 0
+		self.unattached = 0
+
+	def add_row(self, row):
+		self.resources += 1
+		self.ocpu += row.ocpu
+		self.gbytes += row.gbytes
+		if row.byol_status == NONBYOL:
+			self.non_byol += 1
+		if row.vol_attached == 'Not Attached':
+			self.unattached += 1
+
+	def add(self, other):
+		self.resources += other.resources
+		self.ocpu += other.ocpu
+		self.gbytes += other.gbytes
+		self.non_byol += other.non_byol
+		self.unattached += other.unattached
+
+	def values(self):
+		return self.resources, self.ocpu, self.gbytes, self.non_byol, self.unattached
+
+
+class Summary:
+
+	def __init__(self):
+		self.detail = {}        # (compartment, region, type) -> Totals of resources in that compartment only
+
+	def add_row(self, row):
+		key = (row.compartment, row.region, row.type)
+		totals = self.detail.get(key)
+		if totals is None:
+			totals = self.detail[key] = Totals()
+		totals.add_row(row)
+
+	# Add the totals of another summary (e.g. of a region, once its scan has completed)
+	def merge(self, other):
+		for key, other_totals in other.detail.items():
+			totals = self.detail.get(key)
+			if totals is None:
+				totals = self.detail[key] = Totals()
+			totals.add(other_totals)
+
+	# Totals per compartment path, each including all its sub-compartments, in path order
+	def compartment_totals(self):
+		own = {}
+		for (compartment, _, _), totals in self.detail.items():
+			own.setdefault(compartment, Totals()).add(totals)
+
+		rolled_up = {}
+		for compartment, totals in own.items():
+			# The compartment itself and each parent path (/root/a/b -> /root/a/b, /root/a, /root)
+			path = compartment
+			while path != '':
+				rolled_up.setdefault(path, Totals()).add(totals)
+				path = path.rpartition('/')[0]
+
+		return sorted(rolled_up.items(), key=lambda c: c[0].lower())
+
+	# Totals per (region, type), in region and type order
+	def region_type_totals(self):
+		region_types = {}
+		for (_, region, resource_type), totals in self.detail.items():
+			region_types.setdefault((region, resource_type), Totals()).add(totals)
+
+		return sorted(region_types.items())
+
+	def grand_total(self):
+		total = Totals()
+		for totals in self.detail.values():
+			total.add(totals)
+		return total
+
+	# Rows for the summary CSV: compartment rollups, then region/type rollups, then each compartment/region/type
+	def csv_rows(self):
+		for compartment, totals in self.compartment_totals():
+			yield dict(zip(field_names, (compartment, ALL, ALL) + totals.values()))
+
+		for (region, resource_type), totals in self.region_type_totals():
+			yield dict(zip(field_names, (ALL, region, resource_type) + totals.values()))
+
+		for key, totals in sorted(self.detail.items()):
+			yield dict(zip(field_names, key + totals.values()))
@@ -0,0 +1,93 @@
+# ocicloud/trace.py
+#
+# Phase level tracing and profiling for the scripts
+#
+# --trace <file> records nested spans (config load, searches, fetches, parsing, output etc.) and writes them
+# in Chrome trace event format, which can be loaded in chrome://tracing or https://ui.perfetto.dev
+# --profile runs the whole script under cProfile (stats saved to <trace file>.prof, or printed to stderr)
+#
+# Usage in a script:
+#		trace.add_arguments(parser)
+#		args = parser.parse_args()
+#		trace.start(args)
+#		with trace.span('metering fetch', tenancy=tenancy_name):
+#			...
+#
+# When tracing is not enabled, span() does nothing, so the spans can stay in the code
+#
+# 19-oct-2026	Martin Bridge	Created
+# 19-oct-2026	Martin Bridge	span() gives the block its args, so counts found during the span can be added; removed enabled()
+
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_trace_path = None
+_events = []
+_start_ns = 0
+_profiler = None
+
+
+def add_arguments(parser):
+	parser.add_argument('--trace', dest='trace_file', metavar='<file>',
+						help="Write a Chrome trace event file of the run's phases")
+	parser.add_argument('--profile', action='store_true', help="Profile the run with cProfile")
+
+
+# Start tracing/profiling as requested on the command line, output is written when the script exits
+def start(args):
+	global _trace_path, _start_ns, _profiler
+
+	_trace_path = args.trace_file
+	_start_ns = time.perf_counter_ns()
+
+	if args.profile:
+		_profiler = cProfile.Profile()
+		_profiler.enable()
+
+	if _trace_path is not None or _profiler is not None:
+		atexit.register(stop)
+
+
+# Time the enclosed block as a named span, args are shown with the span in the trace viewer
+# The block is given the args dictionary, so it can add to them (e.g. counts only known at the end)
+@contextmanager
+def span(name, **args):
+	if _trace_path is None:
+		yield args
+		return
+
+	begin_ns = time.perf_counter_ns()
+	try:
+		yield args
+	finally:
+		end_ns = time.perf_counter_ns()
+		# Complete ('X') event, times in microseconds
+		_events.append({
+			'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+			'ts': (begin_ns - _start_ns) / 1000, 'dur': (end_ns - begin_ns) / 1000,
+			'args': args})
+
+
+# Write the trace file and profile stats
+def stop():
+	global _trace_path, _profiler
+
+	if _profiler is not None:
+		_profiler.disable()
+		if _trace_path is not None:
+			_profiler.dump_stats(_trace_path + '.prof')
+		else:
+			pstats.Stats(_profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(30)
+		_profiler = None
+
+	if _trace_path is not None:
+		with open(_trace_path, 'wt') as trace_file:
+			json.dump({'traceEvents': _events, 'displayTimeUnit': 'ms'}, trace_file)
+		_trace_path = None
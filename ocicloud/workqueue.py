@@ -0,0 +1,206 @@
+# ocicloud/workqueue.py
+#
+# Durable work queue in a SQLite file, shared by a coordinator and any number of worker processes
+#
+# The coordinator adds units of work (e.g. region x resource type group x compartment chunk), workers claim
+# them one at a time, run them and mark them done (or failed, in which case they are retried up to
+# max_attempts times). A claimed unit whose worker died is claimed again by another worker once its lease
+# has expired (or straight away when a coordinator resumes, if the worker was on the same host). Claims are made
+# in a write transaction, so a unit is only ever given to one worker at a time, and only the worker holding the
+# claim can complete or fail the unit, so a worker whose lease expired can't finish a unit a second time.
+#
+# Workers on other hosts can use the same queue file on a shared file system, as long as it supports file
+# locking (SQLite does not lock reliably on some network file systems).
+#
+# 19-oct-2026	Martin Bridge	Created
+# 19-oct-2026	Martin Bridge	Statistics of completed units
+# 19-oct-2026	Martin Bridge	Only the worker holding a claim can complete or fail it; release claims of dead workers
+
+import json
+import os
+import socket
+import sqlite3
+import time
+
+PENDING = 'pending'
+CLAIMED = 'claimed'
+DONE = 'done'
+FAILED = 'failed'
+
+lease_seconds = 3600        # A claimed unit is given to another worker if not completed within this time
+max_attempts = 3            # Attempts before a unit is marked failed
+busy_timeout = 60           # Seconds to wait for another process's lock
+
+_schema = """
+create table if not exists meta (
+	key         text primary key,
+	value       text not null);
+
+create table if not exists units (
+	id          integer primary key,
+	unit        text not null,              -- JSON description of the work
+	status      text not null default 'pending',
+	worker      text,
+	claimed_at  real,
+	attempts    integer not null default 0,
+	error       text,
+	rows        integer,
+	seconds     real,
+	stats       text);                      -- JSON statistics of the work done (e.g. per resource type)
+"""
+
+
+def _connect(queue_path):
+	# Autocommit mode, transactions are started explicitly
+	connection = sqlite3.connect(queue_path, timeout=busy_timeout, isolation_level=None)
+	connection.execute('pragma journal_mode=wal')
+	return connection
+
+
+# Unique name for a worker process
+def worker_name():
+	return f'{socket.gethostname()}:{os.getpid()}'
+
+
+# Create a new queue (replacing any existing one) with meta data (dictionary) and units (list of dictionaries)
+def create(queue_path, meta, units):
+	for path in (queue_path, queue_path + '-wal', queue_path + '-shm'):
+		if os.path.exists(path):
+			os.remove(path)
+
+	connection = _connect(queue_path)
+	connection.executescript(_schema)
+	connection.execute('begin')
+	connection.executemany('insert into meta (key, value) values (?, ?)', ((k, json.dumps(v)) for k, v in meta.items()))
+	connection.executemany('insert into units (unit) values (?)', ((json.dumps(u),) for u in units))
+	connection.execute('commit')
+	connection.close()
+
+
+def get_meta(queue_path):
+	connection = _connect(queue_path)
+	meta = {key: json.loads(value) for key, value in connection.execute('select key, value from meta')}
+	connection.close()
+	return meta
+
+
+# Claim the next unit, returns (unit id, unit dictionary) or None when there is nothing left to claim
+# Units are claimed in id order, so the coordinator controls the order work is done in
+def claim(queue_path, worker):
+	connection = _connect(queue_path)
+	try:
+		connection.execute('begin immediate')
+		row = connection.execute(
+			'select id, unit from units '
+			'where status = ? or (status = ? and claimed_at < ?) '
+			'order by id limit 1',
+			(PENDING, CLAIMED, time.time() - lease_seconds)).fetchone()
+
+		if row is None:
+			connection.execute('commit')
+			return None
+
+		connection.execute(
+			'update units set status = ?, worker = ?, claimed_at = ?, attempts = attempts + 1 where id = ?',
+			(CLAIMED, worker, time.time(), row[0]))
+		connection.execute('commit')
+		return row[0], json.loads(row[1])
+	finally:
+		connection.close()
+
+
+# Mark a claimed unit done, returns False (and changes nothing) if the worker no longer holds the claim
+# before_commit (if given) is called once the claim has been checked, before the unit is marked done and while
+# the queue is locked, e.g. to move the unit's output into place
+def complete(queue_path, unit_id, worker, rows, seconds, stats=None, before_commit=None):
+	connection = _connect(queue_path)
+	try:
+		connection.execute('begin immediate')
+		if not _holds_claim(connection, unit_id, worker):
+			connection.execute('rollback')
+			return False
+
+		if before_commit is not None:
+			before_commit()
+		connection.execute(
+			'update units set status = ?, rows = ?, seconds = ?, stats = ?, error = null where id = ?',
+			(DONE, rows, seconds, None if stats is None else json.dumps(stats), unit_id))
+		connection.execute('commit')
+		return True
+	finally:
+		connection.close()
+
+
+# Record a failed attempt, the unit goes back in the queue unless it has had max_attempts
+# Returns False (and changes nothing) if the worker no longer holds the claim
+def fail(queue_path, unit_id, worker, error):
+	connection = _connect(queue_path)
+	try:
+		cursor = connection.execute(
+			'update units set status = case when attempts >= ? then ? else ? end, error = ? '
+			'where id = ? and status = ? and worker = ?',
+			(max_attempts, FAILED, PENDING, error, unit_id, CLAIMED, worker))
+		return cursor.rowcount == 1
+	finally:
+		connection.close()
+
+
+def _holds_claim(connection, unit_id, worker):
+	row = connection.execute('select status, worker from units where id = ?', (unit_id,)).fetchone()
+	return row is not None and row[0] == CLAIMED and row[1] == worker
+
+
+# True if the worker process is known to have stopped (only workers on this host can be checked)
+def _worker_stopped(worker):
+	host, _, pid = worker.rpartition(':')
+	if host != socket.gethostname() or not pid.isdigit():
+		return False
+	try:
+		os.kill(int(pid), 0)
+	except ProcessLookupError:
+		return True
+	except OSError:
+		# Exists but belongs to another user
+		return False
+	return False
+
+
+# Put failed units back in the queue (e.g. when a coordinator resumes), attempts start again, and release the
+# claims of workers on this host that are no longer running (claims of workers elsewhere wait for their lease)
+# Returns the number of units released from claims
+def retry_failed(queue_path):
+	connection = _connect(queue_path)
+	try:
+		connection.execute('begin immediate')
+		connection.execute('update units set status = ?, attempts = 0 where status = ?', (PENDING, FAILED))
+
+		stopped = [
+			(PENDING, unit_id, CLAIMED, worker)
+			for unit_id, worker in connection.execute('select id, worker from units where status = ?', (CLAIMED,))
+			if worker is None or _worker_stopped(worker)]
+		connection.executemany(
+			'update units set status = ?, worker = null, attempts = 0 where id = ? and status = ? and worker is ?',
+			stopped)
+		connection.execute('commit')
+		return len(stopped)
+	finally:
+		connection.close()
+
+
+# Number of units in each status
+def status(queue_path):
+	connection = _connect(queue_path)
+	counts = dict(connection.execute('select status, count(*) from units group by status'))
+	connection.close()
+	return {s: counts.get(s, 0) for s in (PENDING, CLAIMED, DONE, FAILED)}
+
+
+# All units as (unit id, unit dictionary, status, rows, seconds, error, stats), in id order
+def units(queue_path):
+	connection = _connect(queue_path)
+	rows = [
+		(unit_id, json.loads(unit), unit_status, rows, seconds, error, None if stats is None else json.loads(stats))
+		for unit_id, unit, unit_status, rows, seconds, error, stats in connection.execute(
+			'select id, unit, status, rows, seconds, error, stats from units order by id')]
+	connection.close()
+	return rows
@@ -2,46 +2,58 @@
 #
 # Parameters:
 #       profile_name
+#       --refresh           probe all service types, ignoring the cache of disabled/empty ones
+#       --trace <file>, --profile (see ocicloud/trace.py)
 #
 # Other parameters picked up from config file using profile name
 #   	username
 #   	password
 #   	idcs_id (idcs-4656dbcafeb47777d3efabcdef12...) from idcs url
 #   	domain_id (cacct-8b4b0c9b4c40173264564750985ff6... select idcs_users in services from myservices page)
+#   	psm_endpoints (optional, comma separated, e.g. https://psm.europe.oraclecloud.com, https://psm.us.oraclecloud.com)
 #
 # Output
 #       stdout, readable column format
 #
 # 27-nov-2019      1.0     mbridge     Created
 # 22-april-2020    1.1     melkayal    Added support for CSV file output
-
-import configparser
+# 19-oct-2026      1.2     mbridge     Cache disabled/empty service types per tenancy to skip useless requests
+# 19-oct-2026      1.3     mbridge     Scan multiple PSM endpoints (psm_endpoints in config file) concurrently
+# 19-oct-2026      1.4     mbridge     Use shared HTTP client (keep-alive, timeouts, retries)
+# 19-oct-2026      1.5     mbridge     Added --trace and --profile options
+# 19-oct-2026      1.6     mbridge     Service instances from ocicloud/psm.py (importable, see iter_psm_services)
+# 19-oct-2026      1.7     mbridge     Only cache service types the endpoint rejects; show how many were skipped
+# 19-oct-2026      1.8     mbridge     No trace span per service (the psm fetch spans cover each request)
+
+import argparse
 import csv
-import os
 import sys
-from datetime import datetime
-import requests
+
+from ocicloud import metering, psm, trace
 
 # ======================================================================================================================
 debug: bool = False
 configfile = '~/.oci/config.ini'
 output_dir = "./log"
+refresh_cache: bool = False             # Ignore the cache (see ocicloud/psm.py) and probe all service types
 # ======================================================================================================================
 
-field_names = ['Tenancy', 'ServiceType', 'ServiceName', 'Creator', 'State', 'Region', 'CreationDate']
+field_names = ['Tenancy', 'Endpoint', 'ServiceType', 'ServiceName', 'Creator', 'State', 'Region', 'CreationDate']
 
 
-def list_psm_services(tenancy_name, username, password, idcs_guid):
+def list_psm_services(tenancy_name, account, endpoints):
 
 	global csv_writer
 
 	if debug:
-		print(f'User:Pass = {username}/{"*" * len(password)}')
-		print(f'IDCSID    = {idcs_guid}')
+		print(f'User:Pass = {account["username"]}/{"*" * len(account["password"])}')
+		print(f'IDCSID    = {account["idcs_guid"]}')
+		print(f'Endpoints = {", ".join(endpoints)}')
 
 	# Print Headings
 	print(
 		f"{'Tenancy':22} "
+		f"{'Endpoint':26} "
 		f"{'Service Type':18} "
 		f"{'Service Name':20.20} "
 		f"{'Creator':28.28} "
@@ -49,94 +61,55 @@ def list_psm_services(tenancy_name, username, password, idcs_guid):
 		f"{'Region':15} "
 		f"{'CreationDate':32} ")
 
-	# Full list - many are now disabled/obsolete in some OCI accounts
-	# service_type_list = [
-	# 	"accs", "adbc", "adwc", "adwcp", "aiacs", "aipod", "analytics", "analyticssub", "andc", "andcp",
-	# 	"apicatalog", "apics", "apicsauto", "apicsautopod", "autoanalytics", "autoanalyticsinst", "autoanalyticspod",
-	# 	"autoblockchain", "bcsmgr", "bcsmgrpod", "bdcsce", "bigdataappliance", "botmxp", "botsaasauto",
-	# 	"botscfg", "botscon", "botsint", "botsmgm", "botspip", "botsxp", "caching", "cec", "cecauto", "cecs", "cecsauto",
-	# 	"container", "containerpod", "cxaana", "cxacfg", "cxacol", "cxapod", "dbcs", "demo",
-	# 	"devserviceapp", "devserviceappauto", "devservicepod", "devservicepodauto", "dhcs", "dics",
-	# 	"dipcauto", "dipcinst", "dipcpod", "erp", "ggcs", "integrationcauto", "integrationcloud",
-	# 	"iotassetmon", "iotconnectedwrker", "iotenterpriseapps", "iotfleetmon", "iotjls", "iotprodmonitoring", "iotsvcasset",
-	# 	"jcs", "mobileccc", "mobilecccom", "mobilecorepod", "mobilecorepodom", "mobileserviceauto",
-	# 	"mobilestandard", "mobilestdccc", "mobilestdcore", "mysqlcs", "oabcsinst", "oabcspod", "oaics",
-	# 	"oehcs", "oehpcs", "oicinst", "oicpod", "oicsubinst", "omce", "omcexternal", "omcp",
-	# 	"ratscontrolplane", "search", "searchcloudapp", "soa", "ssi", "ssip",
-	# 	# "stack",
-	# 	"vbinst", "vbpod", "visualbuilder", "visualbuilderauto", "wtss"]
-
-	service_type_list = ["adbc", "andc", "apicsauto", "autoanalytics", "autoanalyticsinst", "autoblockchain", "bcsmgr",
-						"bdcsce", "botsaasauto", "cecsauto", "dbcs", "devserviceappauto", "dipcauto", "dipcinst",
-						"integrationcauto", "jcs", "mobilestandard", "oabcsinst", "oehcs", "oehpcs", "oicinst", "omcexternal",
-						"searchcloudapp", "soa", "ssi", "vbinst", "visualbuilderauto", "wtss"]
-
-	for service_type in service_type_list:
-		resp = requests.get(
-			"https://psm.europe.oraclecloud.com/paas/api/v1.1/instancemgmt/"
-			+ idcs_guid + "/services/" + service_type + "/instances?limit=500",
-			auth=(username, password),
-			headers={'X-ID-TENANT-NAME': idcs_guid}
-		)
-
-		if resp.status_code != 200:
-			# This means something went wrong.
-			print(f'Error in GET: {resp.status_code} ({resp.reason}) '
-				f'on tenancy {tenancy_name}, service type {service_type}', file=sys.stderr)
-			# msg = json.loads(resp.text)['errorMessage']
-			# print(f'  {msg}', file=sys.stderr)
-			# return -1
-		else:
-			for services in resp.json()['services'].items():
-				svc = services[1]
-
-				dttm = datetime.strptime(svc['creationDate'], "%Y-%m-%dT%H:%M:%S.%f%z")
-				create_date = datetime.strftime(dttm, "%Y-%m-%d %H:%M:%S")
-
-				# Region not always available (e.g. when service initializing)
-				reg = svc.get('region', "N/A")
-
-				print(
-					f"{tenancy_name:22} "
-					f"{svc['serviceType']:18} "
-					f"{svc['serviceName']:20.20} "
-					f"{svc['creator']:28.28} "
-					f"{svc['state']:12} "
-					f"{reg:15} "
-					f"{create_date:32} ")
-
-				output_dict = {
-					'Tenancy': tenancy_name,
-					'ServiceType': svc['serviceType'],
-					'ServiceName': svc['serviceName'],
-					'Creator': svc['creator'],
-					'State': svc['state'],
-					'Region': reg,
-					'CreationDate': create_date
-				}
-
-				format_output(output_dict)
-
-		# TODO: Handle isBYOL flag
+	def print_error(endpoint_name, service_type, message):
+		print(f'Error in GET: {message} '
+			f'on tenancy {tenancy_name}, endpoint {endpoint_name}, service type {service_type}', file=sys.stderr)
+
+	def print_skipped(count):
+		if count > 0:
+			print(f'{count} service type requests skipped (disabled or empty when last checked, use --refresh '
+				f'to check them again)', file=sys.stderr)
+
+	for svc in psm.iter_psm_services(tenancy_name, account, endpoints, refresh_cache, print_error, print_skipped):
+		print(
+			f"{tenancy_name:22} "
+			f"{svc.endpoint:26.26} "
+			f"{svc.service_type:18} "
+			f"{svc.service_name:20.20} "
+			f"{svc.creator:28.28} "
+			f"{svc.state:12} "
+			f"{svc.region:15} "
+			f"{svc.creation_date:32} ")
+
+		output_dict = {
+			'Tenancy': tenancy_name,
+			'Endpoint': svc.endpoint,
+			'ServiceType': svc.service_type,
+			'ServiceName': svc.service_name,
+			'Creator': svc.creator,
+			'State': svc.state,
+			'Region': svc.region,
+			'CreationDate': svc.creation_date
+		}
+
+		format_output(output_dict)
+
 	return
 
 
 def tenancy_usage(tenancy_name):
 
-	# Just in case we use the tilde (~) home directory character
-	configfilepath = os.path.expanduser(configfile)
-
-	if not os.path.isfile(configfilepath):
-		print(f'Error: Config file not found ({configfilepath})', file=sys.stderr)
+	try:
+		ini_data = metering.get_account(tenancy_name, configfile)
+	except FileNotFoundError as error:
+		print(f'Error: {error}', file=sys.stderr)
 		sys.exit(0)
 
-	config = configparser.ConfigParser()
-	config.read(configfilepath)
-
-	ini_data = config[tenancy_name]
+	# PSM endpoints (data centres) to scan for this tenancy
+	endpoints = psm.account_endpoints(ini_data)
 
 	# Get all service details
-	list_psm_services(tenancy_name, ini_data['username'], ini_data['password'], ini_data['idcs_guid'])
+	list_psm_services(tenancy_name, ini_data, endpoints)
 
 
 def csv_open(filename):
@@ -171,11 +144,17 @@ def format_output(output_dict):
 
 if __name__ == "__main__":
 	# Get profile from command line
-	if len(sys.argv) != 2:
-		print(f'Usage: {sys.argv[0]} <profile_name>')
-		sys.exit()
-	else:
-		tenancy_name = sys.argv[1]
+	parser = argparse.ArgumentParser(description='PSM resources in a tenancy')
+	parser.add_argument('profile_name', help="Name of tenancy (config profile name)")
+	parser.add_argument('--refresh', action='store_true',
+						help="Ignore cached disabled/empty service types and probe them all")
+	trace.add_arguments(parser)
+
+	args = parser.parse_args()
+	trace.start(args)
+
+	tenancy_name = args.profile_name
+	refresh_cache = args.refresh
 
 	csv_writer = csv_open(f"psm-{tenancy_name}")
 
@@ -5,6 +5,7 @@
 #	 	profile_name
 # 		start_date
 # 		end_date
+#		--trace <file>, --profile (see ocicloud/trace.py)
 #
 # Other parameters picked up from config file using profile name
 #   	username
@@ -15,6 +16,10 @@
 # Output
 #		stdout, readable column format
 #
+# ListLineCost limitation: usage is fetched as a single TOTAL for the date range, so for a range of more than one
+# month, price bands that reset monthly (e.g. the 10TB free tier of B88327 Outbound Data Transfer) are only counted
+# once and ListLineCost is overstated. Run one month at a time for exact list costs.
+#
 # 08-jan-2018   1.0     mbridge     Created
 # 25-jan-2018   1.1     mbridge     Handle overage charges in service costs
 # 31-oct-2019   1.2	    mbridge	    Simplified output using f-strings (requires python 3.6)
@@ -22,18 +27,21 @@
 # 29-may-2020	1.4		mbridge		Make end-date non-inclusive (i.e. start_date <= d < end_date)
 # 13-apr-2021	1.5		mbridge		Improved command line parameters using argparse
 # 06-jul-2021	1.6		mbridge		Added list price lookup
+# 19-oct-2026	1.7		mbridge		List price uses price bands (e.g. free tier) by cumulative quantity per SKU
+# 19-oct-2026	1.8		mbridge		Use shared HTTP client (keep-alive, timeouts, retries)
+# 19-oct-2026	1.9		mbridge		Added --trace and --profile options
+# 19-oct-2026	1.10	mbridge		Usage cost lines from ocicloud/metering.py (importable, see iter_usage_costs)
+# 19-oct-2026	1.11	mbridge		Documented that monthly price bands count once over a multi-month range
 
 import argparse
-import configparser
 import csv
-import json
-import os
+import itertools
 import re
 import sys
 from datetime import datetime
 from string import Formatter
 
-import requests
+from ocicloud import metering, trace
 
 # ======================================================================================================================
 output_format = "CSV"	   # CSV or normal output, set to "CSV" or anything else
@@ -41,10 +49,7 @@ configfile = '~/.oci/config.ini'
 # ======================================================================================================================
 
 # Dictionary keys and headings
-field_names = [
-	'Tenancy', 'ServiceName', 'ResourceName', 'SKU', 'Qty',
-	'UnitPrc', 'Total', 'Cur', 'OvrFlg', 'ComputeType',
-	'CalcUnitPrc', 'CalcLineCost', 'ListUnitPrc', 'ListLineCost']
+field_names = metering.usage_field_names
 
 print_format = "{Tenancy:24} {ServiceName:24} {ResourceName:58.58} {SKU:6} {Qty:>10.3f} " \
 			   "{UnitPrc:>10.6f} {Total:>7.2f} {Cur:3} {OvrFlg:>6} {ComputeType:11.11} " \
@@ -81,175 +86,63 @@ def csv_init():
 	return csv_writer
 
 
-# Get simplified price list (SKU + prices)
-def get_price_list(currency_code):
-	url = "https://itra.oraclecloud.com/itas/.anon/myservices/api/v1/products?limit=500"
-	http_header = {'X-Oracle-Accept-CurrencyCode': currency_code}
-	resp = requests.get(url, headers=http_header)
-	items = resp.json()['items']
-
-	price_list = {}
-	for item in items:
-
-		partNum = item['partNumber']
-		payg_price = 0
-		month_price = 0
-
-		# Only look at first 2 pricing elements
-		# Some items, such as B88327 (Outbound Data Transfer) have a free amount before charging kicks in
-		# So for easy approximation, we will ignore charged amount
-		# TODO: Fix this horrible hack!
-
-		# Some items, such as 'B94418 - Oracle Cloud Program - Universal Credits - Research Cloud Starter',
-		# do not have a price entry, so skip
-		prices = item.get('prices', None)
-		if prices is not None:
-			for price in prices:
-				if price['model'] == 'PAY_AS_YOU_GO':
-					payg_price = float(price['value'])
-				elif price['model'] == 'MONTHLY_COMMIT':
-					month_price = float(price['value'])
-				else:
-					print(f"Unknown price type: {price['model']}")
-
-			price_list[partNum] = {"payg_price": payg_price, "month_price": month_price}
-
-	return price_list
-
-
-def get_account_charges(tenancy_name, username, password, domain, idcs_guid, start_time, end_time):
+def get_account_charges(tenancy_name, account, start_time, end_time):
 	global csv_writer
 
-	price_list = get_price_list("GBP")
-
 	if debug:
-		print(f'User:Pass      = {username}/{"*" * len(password)}')
-		print(f'Domain, IDCSID = {domain} {idcs_guid}')
+		print(f'User:Pass      = {account["username"]}/{"*" * len(account["password"])}')
+		print(f'Domain, IDCSID = {account["domain"]} {account["idcs_guid"]}')
 		print(f'Start/End Time = {start_time} to {end_time}')
 
-	# Oracle API needs the milliseconds explicitly
 	# UsageType can be TOTAL, HOURLY or DAILY.
-	url_params = {
-		'startTime': start_time.isoformat() + '.000',
-		'endTime': end_time.isoformat() + '.000',
-		'usageType': 'TOTAL',
-		'dcAggEnabled': 'N',
-		'computeTypeEnabled': 'Y'
-	}
-
-	resp = requests.get(
-		'https://itra.oraclecloud.com/metering/api/v1/usagecost/' + domain,
-		auth=(username, password),
-		headers={'X-ID-TENANT-NAME': idcs_guid, 'accept-encoding': '*'},
-		params=url_params,
-		timeout=600
-	)
-
-	if resp.status_code != 200:
-		# This means something went wrong.
-		msg = json.loads(resp.text)['errorMessage']
-		print(f'Error in GET: {resp.status_code} ({resp.reason}) on tenancy {tenancy_name}', file=sys.stderr)
-		print(f'  {msg}', file=sys.stderr)
+	usage_costs = metering.iter_usage_costs(tenancy_name, start_time, end_time, 'TOTAL', account)
+
+	try:
+		# Nothing is fetched until the first cost line is asked for
+		first_cost = next(usage_costs, None)
+	except metering.MeteringError as error:
+		print(f'Error in GET: {error.status_code} ({error.reason}) on tenancy {tenancy_name}', file=sys.stderr)
+		print(f'  {error.message}', file=sys.stderr)
 		return -1
-	else:
-		# Add the cost of all items returned
-		bill_total_cost = 0		# Ignores 'Do Not Bill' costs
-		calc_total_cost = 0		# Uses all quantities, but uses 'Usage' costs where available
-		list_total_cost = 0     # Total cost at list price
-		if detail:
-			# Print Headings
-			if output_format == "CSV":
-				csv_writer = csv_init()
-			else:
-				vformat = Formatter().vformat
-				print(vformat(header_format, field_names, ''))
-
-		items = resp.json()
-
-		for item in items['items']:
-			# Each service could have multiple costs (e.g. in overage)
-			# Because of an anomoly in billing, overage amounts use the wrong unitPrice
-			# so take the unit price from the non-overage entry
-
-			costs = item['costs']
-			calc_unit_price = 0
-			std_unit_price = 0
-
-			# TESTING
-			# Find the pricing record for the non-overage amount
-			# This only works if there are records for overage and non-overage in the same report range!!
-			# This code is pretty ugly, but it's a quick (temporary!) test
-			for cost in costs:
-				if cost['overagesFlag'] == "N":
-					std_unit_price = cost['unitPrice']
-
-			for cost in costs:
-
-				if std_unit_price == 0:
-					# Std price not found for non-overage, so just use the (probabl) overages one
-					calc_unit_price = cost['unitPrice']
-				else:
-					calc_unit_price = std_unit_price
-
-				calc_line_item_cost = calc_unit_price * cost['computedQuantity']
-				calc_total_cost += calc_line_item_cost
-
-				if cost['computeType'] == 'Usage':
-					bill_total_cost += cost['computedAmount']
-
-				# Get list price of current item
-				partNum = item['gsiProductId']
-				try:
-					list_unit_price = price_list[partNum]['month_price']
-				except KeyError:
-					list_unit_price = 0.0
-
-				list_line_cost = cost['computedQuantity'] * list_unit_price
-				list_total_cost += list_line_cost
-
-				if detail:
-					output_dict = {
-						'Tenancy': tenancy_name,
-						'ServiceName': item['serviceName'],
-						'ResourceName': item['resourceName'],
-						'SKU': partNum,
-						'Qty': cost['computedQuantity'],
-						'UnitPrc': cost['unitPrice'],
-						'Total': cost['computedAmount'],
-						'Cur': item['currency'],
-						'OvrFlg': cost['overagesFlag'],
-						'ComputeType': cost['computeType'],
-						'CalcUnitPrc': calc_unit_price,
-						'CalcLineCost': calc_line_item_cost,
-						'ListUnitPrc': list_unit_price,
-						'ListLineCost': list_line_cost
-					}
-
-					format_output(output_dict, output_format)
-
-		return bill_total_cost, calc_total_cost, list_total_cost
 
+	# Add the cost of all items returned
+	bill_total_cost = 0		# Ignores 'Do Not Bill' costs
+	calc_total_cost = 0		# Uses all quantities, but uses 'Usage' costs where available
+	list_total_cost = 0     # Total cost at list price
+	if detail:
+		# Print Headings
+		if output_format == "CSV":
+			csv_writer = csv_init()
+		else:
+			vformat = Formatter().vformat
+			print(vformat(header_format, field_names, ''))
 
-def tenancy_usage(tenancy_name, start_date, end_date, grand_total):
+	with trace.span('aggregation and output', detail=detail):
+		for cost in itertools.chain([] if first_cost is None else [first_cost], usage_costs):
+			calc_total_cost += cost.calc_line_cost
+			if cost.is_billed():
+				bill_total_cost += cost.amount
+			list_total_cost += cost.list_line_cost
 
-	# Just in case we use the tilde (~) home directory character
-	configfilepath = os.path.expanduser(configfile)
+			if detail:
+				format_output(cost.as_dict(), output_format)
+
+	return bill_total_cost, calc_total_cost, list_total_cost
 
-	if not os.path.isfile(configfilepath):
-		print(f'Error: Config file not found ({configfilepath})', file=sys.stderr)
-		sys.exit(0)
 
-	config = configparser.ConfigParser()
-	config.read(configfilepath)
+def tenancy_usage(tenancy_name, start_date, end_date, grand_total):
 
-	ini_data = config[tenancy_name]
+	try:
+		ini_data = metering.get_account(tenancy_name, configfile)
+	except FileNotFoundError as error:
+		print(f'Error: {error}', file=sys.stderr)
+		sys.exit(0)
 
 	# Show usage details
 	# Set time component of end date to 23:59:59.999 to match the behaviour of the Oracle my-services dashboard
 	bill_total_cost, calc_total_cost, list_total_cost = get_account_charges(
 		tenancy_name,
-		ini_data['username'], ini_data['password'],
-		ini_data['domain'], ini_data['idcs_guid'],
+		ini_data,
 		datetime.strptime(start_date, '%d-%m-%Y'),
 		datetime.strptime(end_date, '%d-%m-%Y')  # + timedelta(days=1, seconds=-0.001)
 	)
@@ -270,8 +163,10 @@ if __name__ == "__main__":
 	parser.add_argument('--no-total', dest='total', action='store_false', default=True, help="Print summary costs")
 	parser.add_argument('--debug', action='store_true', help="Print debug info")
 	parser.add_argument('--detail', action='store_true', help="Show detailed breakdown of costs per service ")
+	trace.add_arguments(parser)
 
 	args = parser.parse_args()
+	trace.start(args)
 
 	tenancy_name = args.tenancy
 	start_date = args.start_date